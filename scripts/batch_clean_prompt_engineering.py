@@ -2,7 +2,7 @@
 """Batch clean all JSON files in the prompt_engineering folder.
 
 This script processes all raw JSON files in data/prompt_engineering/
-and creates cleaned versions (with _cleaned suffix).
+and creates cleaned versions (with _cleaned suffix, written as JSONL).
 """
 
 import sys
@@ -40,10 +40,11 @@ def main():
     
     for json_file in json_files:
         # Create output filename with _cleaned suffix
-        output_file = json_file.parent / f"{json_file.stem}_cleaned.json"
+        output_file = json_file.parent / f"{json_file.stem}_cleaned.jsonl"
+        legacy_output_file = json_file.parent / f"{json_file.stem}_cleaned.json"
         
-        # Skip if cleaned version already exists
-        if output_file.exists():
+        # Skip if cleaned version already exists (including older JSON-array output)
+        if output_file.exists() or legacy_output_file.exists():
             print(f"⏭️  Skipping {json_file.name} (cleaned version already exists)")
             continue
         
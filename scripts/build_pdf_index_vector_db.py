@@ -1,83 +1,306 @@
 """Build PDF index using Chroma vector database."""
 
 import argparse
+import hashlib
+import json
 import os
 import sys
+from collections.abc import Iterable, Iterator
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    as_completed,
+    wait,
+)
+from functools import partial
+from itertools import islice
 from pathlib import Path
 from typing import Any
 
 from pypdf import PdfReader
 
+try:
+    import pypdfium2 as pdfium
+except ImportError:
+    pdfium = None
+
 # Add src to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from src.indexers.common import chunk_text
+from src.indexers.common import CHUNKERS, chunk_text, chunk_texts_batched
 from src.utils.config import Config
 from src.utils.logging import get_logger, log_timing
 from src.utils.vector_db import VectorDBClient
 
 logger = get_logger(__name__)
 
+# Chroma insert sweet spot; larger single calls degrade HNSW/WAL commit time
+DEFAULT_INGEST_BATCH_SIZE = 200
+# Concurrent add calls in flight; gains flatten out beyond 2
+DEFAULT_INGEST_CONCURRENCY = 2
+
+# Sidecar {pdf_name: sha256} of indexed files, stored next to the vector DB
+INDEX_MANIFEST_NAME = ".index_manifest.json"
+
+# Extracted PDF text keyed by file hash, so re-chunking skips extraction
+DEFAULT_TEXT_CACHE_DIR = os.getenv("PDF_TEXT_CACHE_DIR", ".cache/pdftext")
+
 
-def extract_text_from_pdf(pdf_path: str) -> str:
-    """Extract text from PDF file."""
+EXTRACTORS = ("pdfium", "pypdf")
+
+
+def _extract_with_pdfium(pdf_path: str) -> list[str]:
+    """Extract page texts with PDFium (C backend)."""
+    doc = pdfium.PdfDocument(pdf_path)
+    text_parts = []
     try:
-        reader = PdfReader(pdf_path)
-        text_parts = []
-        for page in reader.pages:
-            text_parts.append(page.extract_text())
-        return "\n\n".join(text_parts)
+        for page in doc:
+            textpage = page.get_textpage()
+            try:
+                text_parts.append(textpage.get_text_bounded())
+            finally:
+                # Free C handles eagerly instead of waiting for GC
+                textpage.close()
+                page.close()
+    finally:
+        doc.close()
+    return text_parts
+
+
+def _extract_with_pypdf(pdf_path: str) -> list[str]:
+    """
+    Extract page texts with pypdf (pure Python fallback).
+
+    Uses plain extraction mode explicitly; layout mode re-positions every glyph
+    and is much slower on dense pages. Image XObjects are never decoded since
+    page.images is not touched.
+    """
+    reader = PdfReader(pdf_path)
+    return [page.extract_text(extraction_mode="plain") for page in reader.pages]
+
+
+def file_sha256(path: Path) -> str:
+    """Hash a file's contents without loading it into memory at once."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def extract_text_from_pdf(
+    pdf_path: str, extractor: str = "pdfium", cache_dir: str | None = None
+) -> str:
+    """
+    Extract text from PDF file.
+
+    Args:
+        pdf_path: Path to PDF file
+        extractor: "pdfium" (fast, requires pypdfium2) or "pypdf"
+        cache_dir: Directory caching extracted text by file hash; when set,
+            unchanged PDFs are read back from disk instead of re-extracted
+
+    Returns:
+        Page texts joined by blank lines, or "" on failure
+    """
+    if extractor == "pdfium" and pdfium is None:
+        logger.warning("pypdfium2_not_installed", fallback="pypdf")
+        extractor = "pypdf"
+
+    cache_path = None
+    if cache_dir:
+        # Extractors differ in output, so the backend is part of the key
+        cache_path = Path(cache_dir) / f"{file_sha256(Path(pdf_path))}.{extractor}.txt"
+        try:
+            return cache_path.read_text(encoding="utf-8")
+        except FileNotFoundError:
+            pass
+
+    try:
+        with log_timing("extract_pdf", file=pdf_path, extractor=extractor):
+            if extractor == "pdfium":
+                text_parts = _extract_with_pdfium(pdf_path)
+            else:
+                text_parts = _extract_with_pypdf(pdf_path)
+            text = "\n\n".join(text_parts)
     except Exception as e:
-        logger.error("pdf_extraction_failed", file=pdf_path, error=str(e))
+        logger.error("pdf_extraction_failed", file=pdf_path, extractor=extractor, error=str(e))
         return ""
 
+    if cache_path is not None:
+        # Write-then-rename so concurrent workers never read a partial file
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = cache_path.with_suffix(f".{os.getpid()}.tmp")
+        tmp_path.write_text(text, encoding="utf-8")
+        os.replace(tmp_path, cache_path)
+
+    return text
+
 
-def process_pdfs(
+def load_index_manifest(path: Path) -> dict[str, str]:
+    """Load the indexed-file manifest, or an empty one if missing/corrupt."""
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as e:
+        logger.warning("index_manifest_unreadable", path=str(path), error=str(e))
+        return {}
+
+
+def save_index_manifest(path: Path, manifest: dict[str, str]) -> None:
+    """Atomically write the indexed-file manifest."""
+    tmp_path = path.with_suffix(".tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def _iter_paragraph_chunked(
+    extracted: Iterable[tuple[Path, str]], max_tokens: int, overlap: int
+) -> Iterator[tuple[Path, list[str]]]:
+    """Chunk each PDF's text with the paragraph-aware character chunker."""
+    for pdf_file, text in extracted:
+        with log_timing("chunk_pdf", file=str(pdf_file)):
+            yield pdf_file, chunk_text(text, max_tokens=max_tokens, overlap=overlap)
+
+
+def _iter_token_chunked(
+    extracted: Iterable[tuple[Path, str]], max_tokens: int, overlap: int, group_size: int
+) -> Iterator[tuple[Path, list[str]]]:
+    """Chunk PDFs into exact token windows, tokenizing group_size texts per batch."""
+    extracted = iter(extracted)
+    while group := list(islice(extracted, group_size)):
+        with log_timing("chunk_pdf_group", files=len(group)):
+            chunk_lists = chunk_texts_batched(
+                [text for _, text in group], max_tokens=max_tokens, overlap=overlap
+            )
+        for (pdf_file, _), chunks in zip(group, chunk_lists):
+            yield pdf_file, chunks
+
+
+def iter_pdf_batches(
     input_dir: str,
+    batch_size: int = DEFAULT_INGEST_BATCH_SIZE,
     max_tokens: int = 512,
     overlap: int = 64,
-) -> list[dict[str, Any]]:
+    max_workers: int | None = None,
+    extractor: str = "pdfium",
+    dedupe: bool = True,
+    skip_files: set[str] | None = None,
+    processed_files: set[str] | None = None,
+    chunker: str = "paragraph",
+    text_cache_dir: str | None = None,
+) -> Iterator[tuple[list[str], list[str], list[dict[str, Any]]]]:
     """
-    Process PDF files and extract chunks.
-
-    Returns:
-        List of document chunks with text and metadata
+    Extract and chunk PDF files, yielding ingest-ready batches.
+
+    Text extraction is CPU-bound, so PDFs are fanned out across a process pool
+    (one file per task). Chunking stays in the main process, and chunks are
+    streamed out in batches so peak memory is bounded by batch_size rather than
+    the total number of chunks.
+
+    Args:
+        input_dir: Directory containing PDF files
+        batch_size: Chunks per yielded batch
+        max_tokens: Max tokens per chunk
+        overlap: Overlap tokens between chunks
+        max_workers: Extraction worker processes (defaults to CPU count)
+        extractor: PDF text extractor backend (see EXTRACTORS)
+        dedupe: Skip chunks whose exact text was already emitted (repeated
+            headers/footers/boilerplate), saving embedding calls and vectors.
+            Across all files on a full build; within each file when skip_files
+            is set, since chunks of skipped files are not seen and a skipped
+            file must never depend on another file's copy of a chunk
+        skip_files: PDF file names to leave out (e.g. already indexed)
+        processed_files: If given, filled with names of PDFs whose text was
+            extracted and chunked
+        chunker: "paragraph" (character-estimated, paragraph-aware) or
+            "tiktoken" (exact token windows via batched tiktoken encoding)
+        text_cache_dir: Extracted-text cache directory (None disables caching)
+
+    Yields:
+        (ids, documents, metadatas) tuples of at most batch_size chunks
     """
     input_path = Path(input_dir)
     pdf_files = list(input_path.glob("*.pdf"))
 
     if not pdf_files:
         logger.warning("no_pdf_files_found", input_dir=input_dir)
-        return []
+        return
 
-    logger.info("processing_pdfs", count=len(pdf_files))
+    if skip_files:
+        pdf_files = [pdf_file for pdf_file in pdf_files if pdf_file.name not in skip_files]
+        if not pdf_files:
+            logger.info("all_pdfs_skipped", skipped=len(skip_files))
+            return
+
+    max_workers = max_workers or os.cpu_count() or 1
+    logger.info(
+        "processing_pdfs",
+        count=len(pdf_files),
+        skipped=len(skip_files or ()),
+        workers=max_workers,
+    )
 
-    all_docs: list[dict[str, Any]] = []
+    ids: list[str] = []
+    documents: list[str] = []
+    metadatas: list[dict[str, Any]] = []
+    total_chunks = 0
+    seen: set[bytes] = set()
+    duplicates = 0
 
-    for pdf_file in pdf_files:
-        with log_timing("process_pdf", file=str(pdf_file)):
-            text = extract_text_from_pdf(str(pdf_file))
-            if not text.strip():
-                continue
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        # map() preserves input order so chunk IDs stay deterministic
+        extract = partial(extract_text_from_pdf, extractor=extractor, cache_dir=text_cache_dir)
+        texts = executor.map(extract, map(str, pdf_files))
 
-            chunks = chunk_text(text, max_tokens=max_tokens, overlap=overlap)
+        extracted = (
+            (pdf_file, text) for pdf_file, text in zip(pdf_files, texts) if text.strip()
+        )
+        if chunker == "tiktoken":
+            # Tokenize a group of PDFs per call so tiktoken's threads stay busy
+            chunked = _iter_token_chunked(extracted, max_tokens, overlap, group_size=max_workers)
+        else:
+            chunked = _iter_paragraph_chunked(extracted, max_tokens, overlap)
+
+        for pdf_file, chunks in chunked:
+            if processed_files is not None:
+                processed_files.add(pdf_file.name)
+            if skip_files:
+                seen.clear()
 
             for i, chunk in enumerate(chunks):
-                chunk_id = f"{pdf_file.stem}_chunk_{i}"
-                all_docs.append(
+                if dedupe:
+                    digest = hashlib.blake2b(chunk.encode("utf-8"), digest_size=16).digest()
+                    if digest in seen:
+                        duplicates += 1
+                        continue
+                    seen.add(digest)
+
+                ids.append(f"{pdf_file.stem}_chunk_{i}")
+                documents.append(chunk)
+                metadatas.append(
                     {
-                        "id": chunk_id,
-                        "text": chunk,
-                        "metadata": {
-                            "source_file": pdf_file.name,
-                            "chunk_index": i,
-                            "total_chunks": len(chunks),
-                        },
+                        "source_file": pdf_file.name,
+                        "chunk_index": i,
+                        "total_chunks": len(chunks),
                     }
                 )
 
-    logger.info("pdfs_processed", total_chunks=len(all_docs))
-    return all_docs
+                if len(ids) >= batch_size:
+                    total_chunks += len(ids)
+                    yield ids, documents, metadatas
+                    ids, documents, metadatas = [], [], []
+
+    if ids:
+        total_chunks += len(ids)
+        yield ids, documents, metadatas
+
+    logger.info("pdfs_processed", total_chunks=total_chunks, duplicates_skipped=duplicates)
 
 
 def main() -> None:
@@ -90,6 +313,47 @@ def main() -> None:
     parser.add_argument("--max-tokens", type=int, default=512, help="Max tokens per chunk")
     parser.add_argument("--overlap", type=int, default=64, help="Overlap tokens")
     parser.add_argument("--reset", action="store_true", help="Reset/delete existing collection")
+    parser.add_argument(
+        "--workers", type=int, default=None, help="PDF extraction processes (default: CPU count)"
+    )
+    parser.add_argument(
+        "--extractor",
+        choices=EXTRACTORS,
+        default="pdfium",
+        help="PDF text extractor (pypdf is the slower pure-Python fallback)",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=DEFAULT_INGEST_BATCH_SIZE,
+        help="Documents per Chroma add call",
+    )
+    parser.add_argument(
+        "--ingest-concurrency",
+        type=int,
+        default=DEFAULT_INGEST_CONCURRENCY,
+        help="Batches inserted concurrently",
+    )
+    parser.add_argument(
+        "--fast-ingest",
+        action="store_true",
+        help="Unsafe SQLite pragmas (no journal/fsync, exclusive lock) for one-shot rebuilds",
+    )
+    parser.add_argument(
+        "--no-dedupe", action="store_true", help="Index exact-duplicate chunks as well"
+    )
+    parser.add_argument(
+        "--chunker",
+        choices=CHUNKERS,
+        default="paragraph",
+        help="Chunking strategy (tiktoken requires the tiktoken package)",
+    )
+    parser.add_argument(
+        "--no-text-cache", action="store_true", help="Always re-extract PDF text"
+    )
+    parser.add_argument(
+        "--force", action="store_true", help="Re-index PDFs even if unchanged since the last run"
+    )
 
     args = parser.parse_args()
 
@@ -106,31 +370,104 @@ def main() -> None:
 
     # Initialize vector DB
     vector_db = VectorDBClient(config)
+    vector_db.tune_sqlite(fast_ingest=args.fast_ingest)
+
+    ingest_concurrency = max(1, args.ingest_concurrency)
+    if args.fast_ingest and ingest_concurrency > 1:
+        # An exclusive lock allows a single writer connection
+        logger.info("fast_ingest_single_writer", requested_concurrency=ingest_concurrency)
+        ingest_concurrency = 1
 
     # Reset collection if requested
     if args.reset:
         vector_db.delete_collection()
         logger.info("collection_reset")
 
-    # Process PDFs
-    docs = process_pdfs(args.input_dir, args.max_tokens, args.overlap)
-
-    if len(docs) == 0:
-        logger.error("no_documents_processed")
-        return
-
-    # Add documents to vector DB
+    # Skip PDFs whose content hash matches the last successful run
+    manifest_path = Path(vector_db.db_path) / INDEX_MANIFEST_NAME
+    manifest = {} if args.reset or args.force else load_index_manifest(manifest_path)
+    pdf_hashes = {
+        pdf_file.name: file_sha256(pdf_file) for pdf_file in Path(args.input_dir).glob("*.pdf")
+    }
+    unchanged = {name for name, digest in pdf_hashes.items() if manifest.get(name) == digest}
+    changed = [name for name in pdf_hashes if name in manifest and name not in unchanged]
+
+    # A cross-file deduped build stores a shared chunk only under its first
+    # PDF, so re-indexing just a changed PDF would drop the chunk for the
+    # unchanged PDFs that also contain it. Rebuild everything instead
+    if changed and not args.no_dedupe:
+        logger.info("dedupe_full_reindex", changed=len(changed))
+        vector_db.delete_collection()
+        manifest = {}
+        unchanged = set()
+        changed = []
+
+    def add_batch(
+        i: int,
+        batch_ids: list[str],
+        batch_docs: list[str],
+        batch_metas: list[dict[str, Any]],
+    ) -> None:
+        with log_timing("add_batch", i=i, batch_size=len(batch_docs)):
+            vector_db.add_documents(documents=batch_docs, ids=batch_ids, metadatas=batch_metas)
+
+    # Resolve the collection once so worker threads don't race to create it
+    vector_db.get_or_create_collection()
+
+    # Drop chunks of modified PDFs so shorter re-chunks leave no stale entries
+    for name in changed:
+        vector_db.delete_documents(where={"source_file": name})
+
+    # Extract, chunk and insert in a single streaming pass
     # Chroma will handle embeddings automatically using the embedding function
-    with log_timing("add_to_vector_db", count=len(docs)):
-        documents = [doc["text"] for doc in docs]
-        ids = [doc["id"] for doc in docs]
-        metadatas = [doc["metadata"] for doc in docs]
-
-        vector_db.add_documents(
-            documents=documents,
-            ids=ids,
-            metadatas=metadatas,
-        )
+    processed: set[str] = set()
+    batches = iter_pdf_batches(
+        args.input_dir,
+        batch_size=args.batch_size,
+        max_tokens=args.max_tokens,
+        overlap=args.overlap,
+        max_workers=args.workers,
+        extractor=args.extractor,
+        dedupe=not args.no_dedupe,
+        skip_files=unchanged,
+        processed_files=processed,
+        chunker=args.chunker,
+        text_cache_dir=None if args.no_text_cache else DEFAULT_TEXT_CACHE_DIR,
+    )
+    added = 0
+
+    with log_timing("add_to_vector_db"):
+        if ingest_concurrency == 1:
+            # Stay on the main thread (required by --fast-ingest's exclusive lock)
+            for batch in batches:
+                add_batch(added, *batch)
+                added += len(batch[0])
+        else:
+            # Overlap embedding RPC latency of one batch with the HNSW insert of another.
+            # In-flight batches are capped so memory stays bounded by the batch size.
+            with ThreadPoolExecutor(max_workers=ingest_concurrency) as executor:
+                pending: set[Future[None]] = set()
+                for batch in batches:
+                    if len(pending) >= ingest_concurrency:
+                        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            future.result()
+                    pending.add(executor.submit(add_batch, added, *batch))
+                    added += len(batch[0])
+                for future in as_completed(pending):
+                    future.result()
+
+    # Only record hashes once every batch has been inserted; PDFs that failed
+    # extraction stay unrecorded and are retried next run
+    manifest.update({name: pdf_hashes[name] for name in processed})
+    save_index_manifest(manifest_path, manifest)
+
+    if added == 0:
+        if unchanged:
+            logger.info("index_up_to_date", skipped=len(unchanged))
+        else:
+            logger.error("no_documents_processed")
+        return
 
     # Get final count
     count = vector_db.get_count()
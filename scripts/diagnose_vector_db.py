@@ -60,29 +60,34 @@ def main():
             "study design",
         ]
         
-        for query in test_queries:
-            print(f"\n   Query: '{query}'")
-            try:
-                results = collection.query(
-                    query_texts=[query],
-                    n_results=3
-                )
-                
-                if results["ids"] and len(results["ids"][0]) > 0:
-                    print(f"   ✅ Found {len(results['ids'][0])} results")
-                    print(f"      Top distance: {results['distances'][0][0]:.4f}")
-                    print(f"      Top similarity: {1.0 - results['distances'][0][0]:.4f}")
-                    print(f"      Top result: {results['documents'][0][0][:80]}...")
+        # One batched query: a single embedding call and one HNSW search batch
+        try:
+            results = collection.query(
+                query_texts=test_queries,
+                n_results=3
+            )
+        except Exception as e:
+            print(f"   ❌ Search failed: {e}")
+            results = None
+        
+        if results is not None:
+            for query, ids, distances, documents in zip(
+                test_queries, results["ids"], results["distances"], results["documents"]
+            ):
+                print(f"\n   Query: '{query}'")
+                if ids:
+                    print(f"   ✅ Found {len(ids)} results")
+                    print(f"      Top distance: {distances[0]:.4f}")
+                    print(f"      Top similarity: {1.0 - distances[0]:.4f}")
+                    print(f"      Top result: {documents[0][:80]}...")
                 else:
                     print(f"   ❌ No results found")
-            except Exception as e:
-                print(f"   ❌ Search failed: {e}")
         
         print()
         
         # Test retriever
         print("🧪 Testing VectorDBRetriever...")
-        retriever = VectorDBRetriever(config)
+        retriever = VectorDBRetriever(config, vector_db=client)
         retriever.load()
         
         test_query = "what are the inclusion criteria"
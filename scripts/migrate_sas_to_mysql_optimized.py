@@ -3,9 +3,15 @@
 import argparse
 import os
 import sys
+import tempfile
+from collections.abc import Iterator
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from functools import partial
 from pathlib import Path
 from typing import Any
 
+import numpy as np
 import pandas as pd
 
 try:
@@ -29,18 +35,36 @@ configure_logging()
 logger = get_logger(__name__)
 
 
-def read_sas_file(file_path: str) -> pd.DataFrame:
-    """Read SAS file using pyreadstat or fallback to pandas."""
+def read_sas_file(file_path: str, num_processes: int | None = None) -> pd.DataFrame:
+    """
+    Read SAS file using pyreadstat or fallback to pandas.
+    
+    Args:
+        file_path: Path to .sas7bdat file
+        num_processes: Processes for pyreadstat's row-range parallel reader
+            (defaults to half the CPUs; 1 reads in-process)
+    """
     if pyreadstat:
+        if num_processes is None:
+            num_processes = max(1, (os.cpu_count() or 2) // 2)
+        if num_processes > 1:
+            try:
+                df, _ = pyreadstat.read_file_multiprocessing(
+                    pyreadstat.read_sas7bdat, file_path, num_processes=num_processes
+                )
+                return df
+            except Exception as e:
+                # Worker, pickling or row-range split failures: retry in-process
+                logger.warning("pyreadstat_multiprocessing_failed", path=file_path, error=str(e))
         try:
             df, _ = pyreadstat.read_sas7bdat(file_path)
             return df
         except Exception as e:
             logger.warning("pyreadstat_failed", path=file_path, error=str(e))
 
-    # Fallback: try pandas
+    # Fallback: try pandas (decoding strings, which it otherwise returns as bytes)
     try:
-        df = pd.read_sas(file_path)
+        df = pd.read_sas(file_path, encoding="infer")
         return df
     except Exception as e:
         logger.error("pandas_read_failed", path=file_path, error=str(e))
@@ -55,22 +79,242 @@ def get_mysql_connection():
         database=os.getenv("MYSQL_DB", "cotrial_rag"),
         user=os.getenv("MYSQL_USER", "root"),
         password=os.getenv("MYSQL_PASSWORD", ""),
+        allow_local_infile=True,  # Bulk load via LOAD DATA LOCAL INFILE
+        use_pure=False,  # Prefer the C extension when installed
+        autocommit=False,
     )
 
 
+_COLNAME_TRANS = str.maketrans({" ": "_", "-": "_", ".": "_"})
+
+
 def clean_column_name(col: str) -> str:
     """Clean column name for MySQL compatibility."""
-    return col.replace(" ", "_").replace("-", "_").replace(".", "_").lower()
+    return col.translate(_COLNAME_TRANS).lower()
+
+
+def dataframe_to_rows(df: pd.DataFrame) -> list[tuple]:
+    """
+    Convert a DataFrame to insert-ready row tuples with NaN/NaT replaced by None.
+    
+    The null mask is computed column-wise in C rather than per cell in Python.
+    
+    Args:
+        df: DataFrame to convert
+        
+    Returns:
+        List of row tuples of native Python values
+    """
+    columns = []
+    for col in df.columns:
+        series = df[col]
+        if pd.api.types.is_datetime64_any_dtype(series.dtype):
+            # Plain datetimes, which the MySQL connector converts natively
+            arr = np.array(series.dt.to_pydatetime(), dtype=object)
+        else:
+            arr = series.to_numpy(dtype=object, copy=True)
+        arr[series.isna().to_numpy()] = None
+        columns.append(arr)
+    
+    return list(zip(*columns))
+
+
+# Backslash escapes understood by LOAD DATA's default ESCAPED BY '\\'
+_TSV_ESCAPES = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r", "\0": "\\0"})
+
+
+def write_load_data_file(df: pd.DataFrame, path: str) -> None:
+    """
+    Write a DataFrame as a tab-separated file for LOAD DATA INFILE.
+    
+    NULLs are written as \\N and special characters are backslash-escaped.
+    Formatting is done column-wise with vectorized string ops.
+    
+    Args:
+        df: DataFrame to write
+        path: Output file path
+    """
+    fields = []
+    for col in df.columns:
+        series = df[col]
+        if pd.api.types.is_datetime64_any_dtype(series.dtype):
+            text = series.dt.strftime("%Y-%m-%d %H:%M:%S")
+        elif pd.api.types.is_bool_dtype(series.dtype):
+            text = series.astype(int).astype(str)
+        elif pd.api.types.is_numeric_dtype(series.dtype):
+            text = series.astype(str)
+        else:
+            text = series.astype(str).str.translate(_TSV_ESCAPES)
+        fields.append(text.mask(series.isna(), "\\N"))
+    
+    lines = fields[0].str.cat(fields[1:], sep="\t") if len(fields) > 1 else fields[0]
+    
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        f.write("\n".join(lines))
+        f.write("\n")
+
+
+class LoadDataIncomplete(Exception):
+    """LOAD DATA skipped rows or converted values with warnings."""
+
+
+def load_data_local_infile(cursor: Any, table_name: str, df: pd.DataFrame) -> None:
+    """
+    Bulk load a DataFrame with a single LOAD DATA LOCAL INFILE statement.
+    
+    LOAD DATA LOCAL behaves like IGNORE: duplicate keys, truncation and bad
+    conversions only produce warnings. The loaded row count and warnings are
+    checked afterwards so such loads fail instead of silently losing data.
+    
+    Raises:
+        LoadDataIncomplete: If fewer rows than expected were loaded or the
+            statement produced warnings
+    """
+    fd, path = tempfile.mkstemp(suffix=".tsv", prefix=f"{table_name}_")
+    os.close(fd)
+    
+    try:
+        write_load_data_file(df, path)
+        
+        sql_path = Path(path).as_posix().replace("\\", "\\\\").replace("'", "\\'")
+        col_list = ", ".join([f"`{c}`" for c in df.columns])
+        cursor.execute(
+            f"LOAD DATA LOCAL INFILE '{sql_path}' INTO TABLE `{table_name}` "
+            "CHARACTER SET utf8mb4 "
+            "FIELDS TERMINATED BY '\\t' ESCAPED BY '\\\\' "
+            "LINES TERMINATED BY '\\n' "
+            f"({col_list})"
+        )
+        loaded = cursor.rowcount
+        cursor.execute("SHOW WARNINGS LIMIT 10")
+        warnings = cursor.fetchall()
+    finally:
+        os.unlink(path)
+    
+    if loaded != len(df) or warnings:
+        logger.warning(
+            "load_data_incomplete",
+            table=table_name,
+            expected=len(df),
+            loaded=loaded,
+            warnings=[str(w) for w in warnings],
+        )
+        raise LoadDataIncomplete(
+            f"{table_name}: loaded {loaded} of {len(df)} rows with {len(warnings)}+ warnings"
+        )
+    logger.info("load_data_completed", table=table_name, rows=loaded)
+
+
+# Rows per executemany call; the connector rewrites each batch into one
+# multi-row INSERT, so larger batches amortize per-statement overhead
+INSERT_BATCH_SIZE = 10000
+
+
+@contextmanager
+def bulk_load_session(conn: Any, cursor: Any) -> Iterator[None]:
+    """
+    Relax per-row checks on the session for the duration of a bulk load.
+    
+    Disables foreign key and unique checks, and binary logging when the user
+    has the privilege to do so. The load is committed (or rolled back on error)
+    before the settings are restored, since MySQL refuses to change
+    sql_log_bin inside an open transaction.
+    """
+    cursor.execute("SET SESSION foreign_key_checks = 0")
+    cursor.execute("SET SESSION unique_checks = 0")
+    
+    binlog_disabled = False
+    try:
+        cursor.execute("SET SESSION sql_log_bin = 0")
+        binlog_disabled = True
+    except Error as e:
+        logger.debug("sql_log_bin_unchanged", error=str(e))
+    
+    try:
+        yield
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    finally:
+        cursor.execute("SET SESSION foreign_key_checks = 1")
+        cursor.execute("SET SESSION unique_checks = 1")
+        if binlog_disabled:
+            cursor.execute("SET SESSION sql_log_bin = 1")
+
+
+def insert_rows(
+    cursor: Any, table_name: str, df: pd.DataFrame, batch_size: int = INSERT_BATCH_SIZE
+) -> None:
+    """Insert a DataFrame with batched parameterized INSERTs."""
+    cols = list(df.columns)
+    placeholders = ", ".join(["%s"] * len(cols))
+    col_list = ", ".join([f"`{c}`" for c in cols])
+    insert_sql = f"INSERT INTO `{table_name}` ({col_list}) VALUES ({placeholders})"
+    
+    values = dataframe_to_rows(df)
+    
+    # Insert in batches
+    for i in range(0, len(values), batch_size):
+        batch = values[i : i + batch_size]
+        cursor.executemany(insert_sql, batch)
+
+
+def insert_dataframe(cursor: Any, table_name: str, df: pd.DataFrame) -> str:
+    """
+    Insert a DataFrame, preferring LOAD DATA LOCAL INFILE.
+    
+    Falls back to batched INSERTs when local infile is disabled on the client
+    or server, or when LOAD DATA skipped or mangled rows. Anything it loaded is
+    rolled back first, so the INSERTs raise on the offending rows as usual.
+    
+    Returns:
+        Insert method used ("load_data" or "executemany")
+    """
+    cursor.execute("SAVEPOINT before_load_data")
+    try:
+        load_data_local_infile(cursor, table_name, df)
+        return "load_data"
+    except (Error, LoadDataIncomplete) as e:
+        cursor.execute("ROLLBACK TO SAVEPOINT before_load_data")
+        logger.warning("load_data_failed", table=table_name, error=str(e), fallback="executemany")
+    
+    insert_rows(cursor, table_name, df)
+    return "executemany"
+
+
+def max_string_lengths(df: pd.DataFrame) -> dict[str, int]:
+    """
+    Compute the longest value length of every string column in one pass.
+    
+    Lengths are taken from the strings directly rather than casting whole
+    columns with astype(str) first. Nulls are ignored.
+    
+    Args:
+        df: DataFrame to analyze
+        
+    Returns:
+        Mapping of column name to max length (0 if the column is all null)
+    """
+    lengths = {}
+    for col in df.select_dtypes(include=["object", "string"]).columns:
+        try:
+            max_len = df[col].str.len().max()
+        except AttributeError:
+            # Object column holding non-string values
+            max_len = df[col].dropna().astype(str).str.len().max()
+        lengths[col] = 0 if pd.isna(max_len) else int(max_len)
+    return lengths
 
 
-def get_mysql_type(col_name: str, col_type: Any, df: pd.DataFrame) -> str:
+def get_mysql_type(col_name: str, col_type: Any, max_len: int | None = None) -> str:
     """
     Get appropriate MySQL type for a column.
     
     Args:
         col_name: Column name
         col_type: Pandas dtype
-        df: DataFrame to analyze
+        max_len: Longest value length for string columns (from max_string_lengths)
         
     Returns:
         MySQL type string
@@ -96,11 +340,7 @@ def get_mysql_type(col_name: str, col_type: Any, df: pd.DataFrame) -> str:
     
     # Handle string/object columns
     if pd.api.types.is_string_dtype(col_type) or pd.api.types.is_object_dtype(col_type):
-        if len(df) > 0:
-            max_len = df[col_name].astype(str).str.len().max()
-            if pd.isna(max_len) or max_len == 0:
-                max_len = 255
-        else:
+        if not max_len:
             max_len = 255
         
         # Use appropriate text type
@@ -128,16 +368,16 @@ def create_table_with_schema(
     Args:
         conn: MySQL connection
         table_name: Name for the table
-        df: DataFrame with data
+        df: DataFrame with data (columns are renamed in place to MySQL-safe names)
         table_comment: Comment describing the table
         if_exists: What to do if table exists ("replace", "append", "fail")
     """
     cursor = conn.cursor()
     
     try:
-        # Clean column names
-        df_clean = df.copy()
-        df_clean.columns = [clean_column_name(col) for col in df_clean.columns]
+        # Clean column names in place; copying would double peak memory on large tables
+        df.rename(columns=clean_column_name, inplace=True)
+        df_clean = df
         
         # Drop table if replacing
         if if_exists == "replace":
@@ -165,8 +405,10 @@ def create_table_with_schema(
             "ttevent": ["subjid", "ttecd"],
         }
         
+        string_lengths = max_string_lengths(df_clean)
+        
         for col_name, col_type in zip(df_clean.columns, df_clean.dtypes):
-            mysql_type = get_mysql_type(col_name, col_type, df_clean)
+            mysql_type = get_mysql_type(col_name, col_type, string_lengths.get(col_name))
             
             # Add column comment based on name patterns
             comment = ""
@@ -217,41 +459,23 @@ def create_table_with_schema(
         cursor.execute(create_sql)
         logger.info("created_table", table=table_name, columns=len(columns))
         
-        # Create indexes for common query patterns
-        create_indexes(conn, table_name, df_clean)
-        
-        # Insert data in batches
+        # Bulk load data
         if len(df_clean) > 0:
-            cols = list(df_clean.columns)
-            placeholders = ", ".join(["%s"] * len(cols))
-            col_list = ", ".join([f"`{c}`" for c in cols])
-            insert_sql = f"INSERT INTO `{table_name}` ({col_list}) VALUES ({placeholders})"
-            
-            # Convert DataFrame to list of tuples, replacing NaN with None
-            values = []
-            for _, row in df_clean.iterrows():
-                row_values = []
-                for val in row:
-                    if pd.isna(val):
-                        row_values.append(None)
-                    else:
-                        row_values.append(val)
-                values.append(tuple(row_values))
+            with bulk_load_session(conn, cursor):
+                method = insert_dataframe(cursor, table_name, df_clean)
             
-            # Insert in batches
-            batch_size = 1000
-            for i in range(0, len(values), batch_size):
-                batch = values[i : i + batch_size]
-                cursor.executemany(insert_sql, batch)
-            
-            conn.commit()
             logger.info(
                 "inserted_data",
                 table=table_name,
                 rows=len(df_clean),
                 columns=len(df_clean.columns),
+                method=method,
             )
         
+        # Create secondary indexes once the data is in, so each index is built
+        # in a single pass instead of being updated on every inserted row
+        create_indexes(conn, table_name, df_clean)
+        
     except Error as e:
         conn.rollback()
         logger.error("mysql_error", table=table_name, error=str(e))
@@ -353,13 +577,77 @@ TABLE_DESCRIPTIONS = {
 }
 
 
-def migrate_sas_files(input_dir: str, mysql_host: str = "localhost") -> None:
+# Per-process connection used by migration workers
+_worker_conn: Any = None
+
+
+def _init_migration_worker() -> None:
+    """Open one MySQL connection per worker process, reused across its files."""
+    global _worker_conn
+    _worker_conn = get_mysql_connection()
+
+
+def migrate_sas_file(conn: Any, sas_file: Path, read_processes: int | None = None) -> bool:
+    """
+    Migrate a single SAS file into its own table.
+    
+    Args:
+        conn: MySQL connection
+        sas_file: Path to .sas7bdat file
+        read_processes: Processes used to decode the SAS file
+        
+    Returns:
+        True if the table was loaded, False if skipped or failed
+    """
+    table_name = sas_file.stem.lower()
+    table_comment = TABLE_DESCRIPTIONS.get(table_name, f"Data from {sas_file.name}")
+    
+    logger.info("processing_file", file=str(sas_file), table=table_name)
+    
+    try:
+        # Read SAS file
+        df = read_sas_file(str(sas_file), num_processes=read_processes)
+        if df.empty:
+            logger.warning("empty_dataframe", file=str(sas_file))
+            return False
+        
+        # Create table with optimized schema
+        create_table_with_schema(
+            conn, table_name, df, table_comment=table_comment, if_exists="replace"
+        )
+        
+        logger.info(
+            "migration_complete",
+            file=str(sas_file),
+            table=table_name,
+            rows=len(df),
+        )
+        return True
+        
+    except Exception as e:
+        logger.error("migration_failed", file=str(sas_file), error=str(e))
+        return False
+
+
+def _migrate_sas_file_in_worker(sas_file: Path, read_processes: int | None = None) -> bool:
+    """Process pool entry point using the worker's own connection."""
+    return migrate_sas_file(_worker_conn, sas_file, read_processes=read_processes)
+
+
+def migrate_sas_files(
+    input_dir: str, mysql_host: str = "localhost", max_workers: int | None = None
+) -> None:
     """
     Migrate all SAS files from directory to MySQL with optimized schema.
     
+    Each file maps to an independent table, so files are spread across worker
+    processes (each with its own connection) to overlap SAS decoding on one
+    file with MySQL I/O on another.
+    
     Args:
         input_dir: Directory containing SAS files
         mysql_host: MySQL host
+        max_workers: Worker processes (defaults to min(8, file count))
     """
     input_path = Path(input_dir)
     sas_files = list(input_path.glob("*.sas7bdat"))
@@ -368,7 +656,8 @@ def migrate_sas_files(input_dir: str, mysql_host: str = "localhost") -> None:
         logger.error("no_sas_files_found", input_dir=input_dir)
         return
     
-    logger.info("migrating_sas_files_optimized", count=len(sas_files))
+    max_workers = max(1, min(max_workers or 8, len(sas_files)))
+    logger.info("migrating_sas_files_optimized", count=len(sas_files), workers=max_workers)
     
     try:
         conn = get_mysql_connection()
@@ -382,7 +671,9 @@ def migrate_sas_files(input_dir: str, mysql_host: str = "localhost") -> None:
         cursor.close()
         logger.info("database_ready", database=db_name)
         
-        # Process files in order: subjects first, then related tables
+        # Process files in order: subjects first, then related tables.
+        # Tables have no foreign keys, so with several workers this only sets
+        # the submission order.
         priority_order = [
             "subjinfo",  # Base patient table
             "disposit",  # Disposition
@@ -411,37 +702,27 @@ def migrate_sas_files(input_dir: str, mysql_host: str = "localhost") -> None:
         
         sas_files_sorted = sorted(sas_files, key=lambda f: get_priority(str(f)))
         
-        for sas_file in sas_files_sorted:
-            table_name = sas_file.stem.lower()
-            table_comment = TABLE_DESCRIPTIONS.get(table_name, f"Data from {sas_file.name}")
-            
-            logger.info("processing_file", file=str(sas_file), table=table_name)
-            
-            try:
-                # Read SAS file
-                df = read_sas_file(str(sas_file))
-                if df.empty:
-                    logger.warning("empty_dataframe", file=str(sas_file))
-                    continue
-                
-                # Create table with optimized schema
-                create_table_with_schema(
-                    conn, table_name, df, table_comment=table_comment, if_exists="replace"
-                )
-                
-                logger.info(
-                    "migration_complete",
-                    file=str(sas_file),
-                    table=table_name,
-                    rows=len(df),
-                )
-                
-            except Exception as e:
-                logger.error("migration_failed", file=str(sas_file), error=str(e))
-                continue
+        # Split CPUs between file workers and pyreadstat's per-file readers
+        read_processes = max(1, (os.cpu_count() or 1) // max_workers)
+        
+        if max_workers == 1:
+            results = [
+                migrate_sas_file(conn, sas_file, read_processes=read_processes)
+                for sas_file in sas_files_sorted
+            ]
+        else:
+            migrate = partial(_migrate_sas_file_in_worker, read_processes=read_processes)
+            with ProcessPoolExecutor(
+                max_workers=max_workers, initializer=_init_migration_worker
+            ) as executor:
+                results = list(executor.map(migrate, sas_files_sorted))
         
         conn.close()
-        logger.info("migration_all_complete", total_files=len(sas_files))
+        logger.info(
+            "migration_all_complete",
+            total_files=len(sas_files),
+            migrated=sum(results),
+        )
         
     except Error as e:
         logger.error("mysql_connection_failed", error=str(e))
@@ -453,10 +734,13 @@ def main():
     parser = argparse.ArgumentParser(description="Migrate SAS files to MySQL with optimized schema")
     parser.add_argument("--input-dir", required=True, help="Directory containing SAS files")
     parser.add_argument("--mysql-host", default="localhost", help="MySQL host")
+    parser.add_argument(
+        "--workers", type=int, default=None, help="Parallel file migrations (default: up to 8)"
+    )
     
     args = parser.parse_args()
     
-    migrate_sas_files(args.input_dir, args.mysql_host)
+    migrate_sas_files(args.input_dir, args.mysql_host, max_workers=args.workers)
 
 
 if __name__ == "__main__":
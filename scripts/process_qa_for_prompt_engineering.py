@@ -5,14 +5,33 @@ Cleans Q&A data by:
 - Removing "Not computable" entries
 - Converting structured answers to natural language
 - Filtering out low-quality entries
-- Saving cleaned data for prompt engineering use
+- Saving cleaned data for prompt engineering use (JSONL by default, or a
+  JSON array when the output path ends in .json)
 """
 
 import json
 import math
+from collections.abc import Callable, Iterator
 from pathlib import Path
 from typing import Any
 
+import numpy as np
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
 
 def is_nan(value: Any) -> bool:
     """Check if value is NaN."""
@@ -21,223 +40,468 @@ def is_nan(value: Any) -> bool:
     return False
 
 
+# Output templates and the defaults used when a field is missing from the answer.
+# Fields are merged into one dict ({**defaults, **data}) and rendered with format_map.
+_TEMPORAL_DEFAULTS = {
+    "n": 0,
+    "a_responder_and_immune": 0,
+    "b_responder_no_immune": 0,
+    "c_nonresponder_immune": 0,
+    "d_nonresponder_no_immune": 0,
+}
+_TEMPORAL_TEMPLATE = (
+    "Analysis of {n} patients shows: {a_responder_and_immune} responders with immune-related AEs, "
+    "{b_responder_no_immune} responders without immune AEs, "
+    "{c_nonresponder_immune} non-responders with immune AEs, "
+    "and {d_nonresponder_no_immune} non-responders without immune AEs."
+)
+_ODDS_RATIO_TEMPLATE = "The odds ratio is {:.2f}."
+
+_AE_WINDOW_TEMPLATE = (
+    "Adverse events relative to dose timing: Total of {total} AEs across all time windows. "
+    "Distribution: {distribution}. "
+    "{note}"
+)
+
+_OUTLIER_DEFAULTS = {
+    "outlier_sites_by_rate_grade>=3": [],
+    "overall_site_rate_mean": 0,
+    "overall_site_rate_sd": 0,
+    "method": "",
+}
+_NO_OUTLIERS_TEMPLATE = (
+    "No outlier sites detected. Overall site rate for Grade ≥3 AEs: "
+    "mean = {overall_site_rate_mean:.2%}, standard deviation = {overall_site_rate_sd:.2%}. {method}"
+)
+_OUTLIERS_TEMPLATE = (
+    "Outlier sites with abnormal Grade ≥3 AE rates: {outliers}. "
+    "Overall site rate: mean = {overall_site_rate_mean:.2%}, SD = {overall_site_rate_sd:.2%}. "
+    "{method}"
+)
+
+_HEPATIC_DEFAULTS = {
+    "n_subjects_pfs": 0,
+    "n_events": 0,
+    "n_hepatic_gte3_subjects": 0,
+    "median_pfs_events_only_all": 0,
+    "median_pfs_events_only_excluding_hepatic_gte3": 0,
+    "pseudo_hr_excluding_vs_all": 0,
+}
+_HEPATIC_TEMPLATE = (
+    "Simulation of removing patients with Grade ≥3 hepatic AEs: "
+    "Of {n_subjects_pfs} subjects with PFS data, {n_events} events occurred. "
+    "{n_hepatic_gte3_subjects} subjects had Grade ≥3 hepatic AEs. "
+    "Median PFS (all subjects): {median_pfs_events_only_all:.2f} months. "
+    "Median PFS (excluding hepatic Grade ≥3): "
+    "{median_pfs_events_only_excluding_hepatic_gte3:.2f} months. "
+    "Pseudo-hazard ratio: {pseudo_hr_excluding_vs_all:.3f}. {caveat}"
+)
+
+_DRUG_FLAGS_TEMPLATE = (
+    "Drug interaction analysis for {n} patients: "
+    "{nsaid} with peri-dose NSAID, {folic} with prior folic acid, "
+    "{b12} with prior B12, {dexa} with dexamethasone premedication. "
+)
+
+_SITE_LAG_DEFAULTS = {"median": 0, "mean": 0, "count": 0, "screen_fail_rate": 0}
+_SITE_LAG_TEMPLATE = (
+    "Site {INVID}: {count} subjects, median lag {median:.1f} days "
+    "(mean {mean:.1f}), screen fail rate {screen_fail_rate:.1%}"
+)
+
+_ELIGIBILITY_DEFAULTS = {"n_with_ecog": 0, "pct_meet_ecog_0_1": 0, "sample_first_50": []}
+_ELIGIBILITY_TEMPLATE = (
+    "Eligibility analysis: {n_with_ecog} patients with ECOG data. "
+    "{pct_meet_ecog_0_1:.1%} meet ECOG 0-1 criteria (required for inclusion). "
+)
+_ECOG_SAMPLE_TEMPLATE = "Sample of {n} patients: {ecog_0} with ECOG 0, {ecog_1} with ECOG 1. "
+
+
+# Per-subject drug flags counted by the drug-interaction handler, in output order
+_FLAG_KEYS = ("has_peri_nsaid", "has_folic_prior", "has_b12_prior", "has_dexa_premed")
+
+# Below this many records the NumPy conversion costs more than a plain loop saves
+_VECTORIZE_MIN_LEN = 256
+
+
+# Arrays with at least this many cells go through the compiled kernels (when numba
+# is installed); below it the dispatch overhead outweighs the gain over NumPy
+_NUMBA_MIN_CELLS = 10_000
+
+if njit is not None:
+
+    @njit("i8[:](b1[:, ::1])", cache=True, boundscheck=False)
+    def _count_columns(a):
+        """Sum each column of a C-contiguous bool matrix."""
+        n, m = a.shape
+        out = np.zeros(m, dtype=np.int64)
+        for i in range(n):
+            for j in range(m):
+                out[j] += a[i, j]
+        return out
+
+    @njit("UniTuple(i8, 2)(f8[::1])", cache=True, boundscheck=False)
+    def _count_ecog_0_1(ecog):
+        """Count entries equal to 0.0 and to 1.0."""
+        zeros = 0
+        ones = 0
+        for v in ecog:
+            if v == 0.0:
+                zeros += 1
+            elif v == 1.0:
+                ones += 1
+        return zeros, ones
+
+else:
+    _count_columns = None
+    _count_ecog_0_1 = None
+
+
+def _count_flags(flags: list[dict[str, Any]]) -> tuple[int, ...]:
+    """Count truthy values of each _FLAG_KEYS field across subject records."""
+    if len(flags) >= _VECTORIZE_MIN_LEN:
+        arr = np.array([[bool(f.get(k)) for k in _FLAG_KEYS] for f in flags], dtype=bool)
+        if _count_columns is not None and arr.size >= _NUMBA_MIN_CELLS:
+            counts = _count_columns(arr)
+        else:
+            counts = arr.sum(axis=0)
+        return tuple(int(c) for c in counts)
+    
+    # Count flags in a single pass
+    nsaid_count = folic_count = b12_count = dexa_count = 0
+    for f in flags:
+        if f.get("has_peri_nsaid"):
+            nsaid_count += 1
+        if f.get("has_folic_prior"):
+            folic_count += 1
+        if f.get("has_b12_prior"):
+            b12_count += 1
+        if f.get("has_dexa_premed"):
+            dexa_count += 1
+    return nsaid_count, folic_count, b12_count, dexa_count
+
+
+def _count_ecog(sample: list[dict[str, Any]]) -> tuple[int, int]:
+    """Count records with ECOG 0 and ECOG 1."""
+    if len(sample) >= _VECTORIZE_MIN_LEN:
+        # Non-numeric values (None, strings) never match, as in the loop below
+        ecog = np.fromiter(
+            (e if isinstance(e, (int, float)) else np.nan for e in (s.get("ECOG") for s in sample)),
+            dtype=np.float64,
+            count=len(sample),
+        )
+        if _count_ecog_0_1 is not None and ecog.size >= _NUMBA_MIN_CELLS:
+            ecog_0, ecog_1 = _count_ecog_0_1(ecog)
+            return int(ecog_0), int(ecog_1)
+        return int(np.count_nonzero(ecog == 0.0)), int(np.count_nonzero(ecog == 1.0))
+    
+    ecog_0 = ecog_1 = 0
+    for s in sample:
+        ecog = s.get("ECOG")
+        if ecog == 0.0:
+            ecog_0 += 1
+        elif ecog == 1.0:
+            ecog_1 += 1
+    return ecog_0, ecog_1
+
+
+def _handle_temporal_cooccurrence(answer: dict[str, Any]) -> str | None:
+    """Temporal co-occurrence analysis (2x2 responder/immune-AE table)."""
+    if "n" not in answer:
+        return _handle_unknown(answer)
+    
+    natural_parts = []
+    fields = {**_TEMPORAL_DEFAULTS, **answer}
+    
+    if fields["n"] > 0:
+        natural_parts.append(_TEMPORAL_TEMPLATE.format_map(fields))
+        or_val = answer.get("odds_ratio")
+        if not is_nan(or_val):
+            natural_parts.append(_ODDS_RATIO_TEMPLATE.format(or_val))
+    
+    return " ".join(natural_parts) if natural_parts else None
+
+
+def _handle_ae_window(answer: dict[str, Any]) -> str | None:
+    """AE counts relative to dose timing windows."""
+    counts = answer["ae_relative_to_dose_window_counts"]
+    return _AE_WINDOW_TEMPLATE.format(
+        total=sum(counts.values()),
+        distribution=", ".join([f"{k} days: {v} AEs" for k, v in counts.items()]),
+        note=answer.get("note", ""),
+    )
+
+
+def _handle_site_outliers(answer: dict[str, Any]) -> str | None:
+    """Site statistics for Grade >=3 AE rates."""
+    fields = {**_OUTLIER_DEFAULTS, **answer}
+    outliers = fields["outlier_sites_by_rate_grade>=3"]
+    
+    if len(outliers) == 0:
+        return _NO_OUTLIERS_TEMPLATE.format_map(fields)
+    fields["outliers"] = ", ".join(map(str, outliers))
+    return _OUTLIERS_TEMPLATE.format_map(fields)
+
+
+def _handle_hepatic_pfs(answer: dict[str, Any]) -> str | None:
+    """PFS hazard ratio simulation excluding hepatic Grade >=3 AEs."""
+    fields = {**_HEPATIC_DEFAULTS, **answer["hepatic_gte3_vs_pfs_summary"]}
+    fields["caveat"] = answer.get("caveat", "")
+    return _HEPATIC_TEMPLATE.format_map(fields)
+
+
+def _handle_drug_flags(answer: dict[str, Any]) -> str | None:
+    """Drug interaction flags per subject."""
+    flags = answer.get("per_subject_flags_sample_first_50", [])
+    definitions = answer.get("definitions", {})
+    
+    if len(flags) == 0:
+        return None
+    
+    nsaid_count, folic_count, b12_count, dexa_count = _count_flags(flags)
+    
+    natural_parts = [
+        _DRUG_FLAGS_TEMPLATE.format(
+            n=len(flags), nsaid=nsaid_count, folic=folic_count, b12=b12_count, dexa=dexa_count
+        )
+    ]
+    
+    if definitions:
+        def_text = " ".join([f"{k}: {v}" for k, v in definitions.items()])
+        natural_parts.append(f"Definitions: {def_text}")
+    
+    return " ".join(natural_parts)
+
+
+def _handle_site_lag(answer: dict[str, Any]) -> str | None:
+    """Time-to-randomization lag statistics for top sites."""
+    stats = answer.get("site_lag_stats_top10", [])
+    note = answer.get("note", "")
+    
+    if len(stats) == 0:
+        return None
+    
+    natural_parts = ["Time-to-randomization analysis for top 10 sites: "]
+    site_details = []
+    for stat in stats[:5]:  # Top 5 for brevity
+        fields = {**_SITE_LAG_DEFAULTS, **stat}
+        fields["INVID"] = int(stat.get("INVID", 0))
+        site_details.append(_SITE_LAG_TEMPLATE.format_map(fields))
+    natural_parts.append("; ".join(site_details))
+    if note:
+        natural_parts.append(note)
+    
+    return " ".join(natural_parts)
+
+
+def _handle_eligibility(answer: dict[str, Any]) -> str | None:
+    """Eligible patients summary by ECOG status."""
+    fields = {**_ELIGIBILITY_DEFAULTS, **answer["eligible_patients_summary"]}
+    sample = fields["sample_first_50"]
+    note = answer.get("note", "")
+    
+    natural_parts = [_ELIGIBILITY_TEMPLATE.format_map(fields)]
+    
+    if len(sample) > 0:
+        ecog_0, ecog_1 = _count_ecog(sample)
+        natural_parts.append(
+            _ECOG_SAMPLE_TEMPLATE.format(n=len(sample), ecog_0=ecog_0, ecog_1=ecog_1)
+        )
+    
+    if note:
+        natural_parts.append(note)
+    
+    return " ".join(natural_parts)
+
+
+def _handle_unknown(answer: dict[str, Any]) -> str | None:
+    """Keep unrecognized structured answers as JSON if they have data."""
+    if len(answer) > 0:
+        return json.dumps(answer, indent=2)
+    return None
+
+
+# Sentinel key -> handler, checked in this order (first match wins)
+HANDLERS: dict[str, Callable[[dict[str, Any]], str | None]] = {
+    "a_responder_and_immune": _handle_temporal_cooccurrence,
+    "ae_relative_to_dose_window_counts": _handle_ae_window,
+    "outlier_sites_by_rate_grade>=3": _handle_site_outliers,
+    "hepatic_gte3_vs_pfs_summary": _handle_hepatic_pfs,
+    "per_subject_flags_sample_first_50": _handle_drug_flags,
+    "site_lag_stats_top10": _handle_site_lag,
+    "eligible_patients_summary": _handle_eligibility,
+}
+
+# Memoized dispatch: the full key set of an answer determines its handler, and
+# exports reuse a handful of schemas, so after warm-up dispatch is one lookup
+_SIG2HANDLER: dict[frozenset[str], Callable[[dict[str, Any]], str | None]] = {}
+_SIG2HANDLER_MAX = 1024
+
+
+def _resolve_handler(answer: dict[str, Any]) -> Callable[[dict[str, Any]], str | None]:
+    """Return the handler for an answer's key signature, scanning sentinels on a miss."""
+    signature = frozenset(answer)
+    handler = _SIG2HANDLER.get(signature)
+    if handler is None:
+        # First sentinel key present wins
+        key = next((k for k in HANDLERS if k in answer), None)
+        handler = HANDLERS[key] if key is not None else _handle_unknown
+        if len(_SIG2HANDLER) < _SIG2HANDLER_MAX:
+            _SIG2HANDLER[signature] = handler
+    return handler
+
+
 def convert_structured_to_natural_language(question: str, answer: Any) -> str | None:
     """
     Convert structured answer data to natural language.
     
     Returns None if answer should be filtered out.
     """
-    # Filter out "Not computable" entries
-    if isinstance(answer, str):
-        if answer.lower().startswith("not computable"):
-            return None
-        if answer.lower().startswith("partially computable"):
-            # Keep but note it's partial
+    match answer:
+        case str():
+            # Filter out "Not computable" entries. Only the prefix matters for
+            # these checks, so avoid lowering long answers in full
+            prefix = answer[:32].lower()
+            if prefix.startswith("not computable"):
+                return None
+            if prefix.startswith("partially computable"):
+                # Keep but note it's partial
+                return answer
+            if prefix == "computed in file.":
+                return None  # Too vague
+            # Return natural language strings as-is
             return answer
-        if answer.lower() == "computed in file.":
-            return None  # Too vague
-        # Return natural language strings as-is
-        return answer
-    
-    # Handle dictionary answers
-    if isinstance(answer, dict):
-        # Check for empty or minimal data
-        if not answer or len(answer) == 0:
-            return None
-        
-        # Handle specific structured formats
-        natural_parts = []
-        
-        # Temporal co-occurrence analysis
-        if "n" in answer and "a_responder_and_immune" in answer:
-            n = answer.get("n", 0)
-            a = answer.get("a_responder_and_immune", 0)
-            b = answer.get("b_responder_no_immune", 0)
-            c = answer.get("c_nonresponder_immune", 0)
-            d = answer.get("d_nonresponder_no_immune", 0)
-            
-            if n > 0:
-                natural_parts.append(
-                    f"Analysis of {n} patients shows: {a} responders with immune-related AEs, "
-                    f"{b} responders without immune AEs, {c} non-responders with immune AEs, "
-                    f"and {d} non-responders without immune AEs."
-                )
-                if not is_nan(answer.get("odds_ratio")):
-                    or_val = answer.get("odds_ratio")
-                    natural_parts.append(f"The odds ratio is {or_val:.2f}.")
-        
-        # AE window counts
-        elif "ae_relative_to_dose_window_counts" in answer:
-            counts = answer["ae_relative_to_dose_window_counts"]
-            note = answer.get("note", "")
-            total = sum(counts.values())
-            natural_parts.append(
-                f"Adverse events relative to dose timing: Total of {total} AEs across all time windows. "
-                f"Distribution: {', '.join([f'{k} days: {v} AEs' for k, v in counts.items()])}. "
-                f"{note}"
-            )
-        
-        # Site statistics
-        elif "outlier_sites_by_rate_grade>=3" in answer:
-            outliers = answer.get("outlier_sites_by_rate_grade>=3", [])
-            mean = answer.get("overall_site_rate_mean", 0)
-            sd = answer.get("overall_site_rate_sd", 0)
-            method = answer.get("method", "")
-            
-            if len(outliers) == 0:
-                natural_parts.append(
-                    f"No outlier sites detected. Overall site rate for Grade ≥3 AEs: "
-                    f"mean = {mean:.2%}, standard deviation = {sd:.2%}. {method}"
-                )
-            else:
-                natural_parts.append(
-                    f"Outlier sites with abnormal Grade ≥3 AE rates: {', '.join(map(str, outliers))}. "
-                    f"Overall site rate: mean = {mean:.2%}, SD = {sd:.2%}. {method}"
-                )
-        
-        # PFS hazard ratio simulation
-        elif "hepatic_gte3_vs_pfs_summary" in answer:
-            summary = answer["hepatic_gte3_vs_pfs_summary"]
-            caveat = answer.get("caveat", "")
-            n_subjects = summary.get("n_subjects_pfs", 0)
-            n_events = summary.get("n_events", 0)
-            n_hepatic = summary.get("n_hepatic_gte3_subjects", 0)
-            median_all = summary.get("median_pfs_events_only_all", 0)
-            median_excl = summary.get("median_pfs_events_only_excluding_hepatic_gte3", 0)
-            hr = summary.get("pseudo_hr_excluding_vs_all", 0)
-            
-            natural_parts.append(
-                f"Simulation of removing patients with Grade ≥3 hepatic AEs: "
-                f"Of {n_subjects} subjects with PFS data, {n_events} events occurred. "
-                f"{n_hepatic} subjects had Grade ≥3 hepatic AEs. "
-                f"Median PFS (all subjects): {median_all:.2f} months. "
-                f"Median PFS (excluding hepatic Grade ≥3): {median_excl:.2f} months. "
-                f"Pseudo-hazard ratio: {hr:.3f}. {caveat}"
-            )
-        
-        # Drug interaction flags
-        elif "per_subject_flags_sample_first_50" in answer:
-            flags = answer.get("per_subject_flags_sample_first_50", [])
-            definitions = answer.get("definitions", {})
-            
-            if len(flags) > 0:
-                # Count flags
-                nsaid_count = sum(1 for f in flags if f.get("has_peri_nsaid", False))
-                folic_count = sum(1 for f in flags if f.get("has_folic_prior", False))
-                b12_count = sum(1 for f in flags if f.get("has_b12_prior", False))
-                dexa_count = sum(1 for f in flags if f.get("has_dexa_premed", False))
-                
-                natural_parts.append(
-                    f"Drug interaction analysis for {len(flags)} patients: "
-                    f"{nsaid_count} with peri-dose NSAID, {folic_count} with prior folic acid, "
-                    f"{b12_count} with prior B12, {dexa_count} with dexamethasone premedication. "
-                )
-                
-                if definitions:
-                    def_text = " ".join([f"{k}: {v}" for k, v in definitions.items()])
-                    natural_parts.append(f"Definitions: {def_text}")
-        
-        # Site lag statistics
-        elif "site_lag_stats_top10" in answer:
-            stats = answer.get("site_lag_stats_top10", [])
-            note = answer.get("note", "")
-            
-            if len(stats) > 0:
-                natural_parts.append(
-                    f"Time-to-randomization analysis for top 10 sites: "
-                )
-                site_details = []
-                for stat in stats[:5]:  # Top 5 for brevity
-                    invid = int(stat.get("INVID", 0))
-                    median = stat.get("median", 0)
-                    mean = stat.get("mean", 0)
-                    count = stat.get("count", 0)
-                    screen_fail = stat.get("screen_fail_rate", 0)
-                    site_details.append(
-                        f"Site {invid}: {count} subjects, median lag {median:.1f} days "
-                        f"(mean {mean:.1f}), screen fail rate {screen_fail:.1%}"
-                    )
-                natural_parts.append("; ".join(site_details))
-                if note:
-                    natural_parts.append(note)
         
-        # Eligible patients summary
-        elif "eligible_patients_summary" in answer:
-            summary = answer["eligible_patients_summary"]
-            n_ecog = summary.get("n_with_ecog", 0)
-            pct = summary.get("pct_meet_ecog_0_1", 0)
-            sample = summary.get("sample_first_50", [])
-            note = answer.get("note", "")
-            
-            natural_parts.append(
-                f"Eligibility analysis: {n_ecog} patients with ECOG data. "
-                f"{pct:.1%} meet ECOG 0-1 criteria (required for inclusion). "
-            )
-            
-            if len(sample) > 0:
-                ecog_0 = sum(1 for s in sample if s.get("ECOG") == 0.0)
-                ecog_1 = sum(1 for s in sample if s.get("ECOG") == 1.0)
-                natural_parts.append(
-                    f"Sample of {len(sample)} patients: {ecog_0} with ECOG 0, {ecog_1} with ECOG 1. "
-                )
-            
-            if note:
-                natural_parts.append(note)
+        case dict() if answer:
+            return _resolve_handler(answer)(answer)
         
-        # If we couldn't convert, check if it has meaningful data
-        else:
-            # Try to extract any meaningful information
-            if len(answer) > 0:
-                # Keep as JSON string if it has data
-                return json.dumps(answer, indent=2)
+        case _:
+            # Filter out empty dicts and other types (lists without context, numbers, etc.)
             return None
-        
-        if natural_parts:
-            return " ".join(natural_parts)
-        return None
-    
-    # Filter out other types (lists without context, numbers, etc.)
-    return None
 
 
-def process_qa_file(input_path: Path, output_path: Path) -> None:
-    """Process Q&A JSON file and save cleaned version."""
-    print(f"📖 Reading {input_path}...")
-    with open(input_path, "r", encoding="utf-8") as f:
-        data = json.load(f)
+def _loads(data: bytes) -> Any:
+    """Parse JSON with orjson when available, falling back to stdlib json."""
+    if orjson is not None:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            # orjson rejects the NaN/Infinity literals the analysis exports contain
+            pass
+    return json.loads(data)
+
+
+def _dumps_entry(entry: dict[str, Any], indent: bool = True) -> bytes:
+    """
+    Serialize an output entry to UTF-8 JSON bytes, non-ASCII kept as-is.
     
-    print(f"📊 Original entries: {len(data)}")
+    With indent, the entry is laid out as an element of a 2-space indented
+    list (the layout json.dump(list, indent=2) produces); otherwise compact.
+    """
+    if orjson is not None:
+        if not indent:
+            return orjson.dumps(entry)
+        return orjson.dumps(entry, option=orjson.OPT_INDENT_2).replace(b"\n", b"\n  ")
+    if not indent:
+        return json.dumps(entry, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return json.dumps(entry, indent=2, ensure_ascii=False).replace("\n", "\n  ").encode("utf-8")
+
+
+def iter_qa_pairs(input_path: Path, stream: bool = True) -> Iterator[tuple[str, Any]]:
+    """
+    Yield (question, answer) pairs from a top-level JSON object.
     
-    cleaned_data = []
-    removed_count = 0
+    Streams with ijson when available (and stream is set) so only one entry is
+    materialized at a time; otherwise loads the whole file. ijson raises
+    ijson.JSONError on NaN/Infinity literals, which only the loading path accepts.
+    """
+    with open(input_path, "rb") as f:
+        if stream and ijson is not None:
+            # use_float keeps numbers as float (not Decimal) to match json.load
+            yield from ijson.kvitems(f, "", use_float=True)
+        else:
+            yield from _loads(f.read()).items()
+
+
+def process_qa_file(input_path: Path, output_path: Path, indent: bool = True) -> None:
+    """
+    Process Q&A JSON file and save cleaned version.
     
-    for question, answer in data.items():
-        # Convert structured answer to natural language
-        natural_answer = convert_structured_to_natural_language(question, answer)
-        
-        if natural_answer is None:
-            removed_count += 1
-            continue
-        
-        cleaned_data.append({
-            "question": question,
-            "answer": natural_answer,
-            "source": "S130_QA_ALL",
-        })
+    Args:
+        input_path: Raw Q&A JSON file (question -> answer object)
+        output_path: Where to write the cleaned entries; a .jsonl path gets one
+            compact JSON object per line, anything else a JSON list
+        indent: Pretty-print the JSON list with 2-space indentation; compact
+            output is smaller and faster to write (ignored for JSONL)
+    """
+    print(f"📖 Reading {input_path}...")
     
-    print(f"✅ Kept {len(cleaned_data)} entries")
-    print(f"❌ Removed {removed_count} entries")
+    # Framing around the entries: header, separator before the first entry,
+    # separator between entries, trailer after the last, trailer when empty
+    if output_path.suffix == ".jsonl":
+        indent = False
+        head, first_sep, sep, tail, empty_tail = b"", b"", b"\n", b"\n", b""
+    elif indent:
+        head, first_sep, sep, tail, empty_tail = b"[", b"\n  ", b",\n  ", b"\n]", b"]"
+    else:
+        head, first_sep, sep, tail, empty_tail = b"[", b"", b",", b"]", b"]"
     
-    # Save cleaned data
+    # Entries are converted and written as they are parsed, so neither the
+    # input nor the cleaned output is ever held in memory as a whole. They go
+    # to a temp file that replaces output_path only once the pass succeeds
     output_path.parent.mkdir(parents=True, exist_ok=True)
-    with open(output_path, "w", encoding="utf-8") as f:
-        json.dump(cleaned_data, f, indent=2, ensure_ascii=False)
+    tmp_path = output_path.with_name(output_path.name + ".tmp")
+    stream_errors = (ijson.JSONError,) if ijson is not None else ()
+    try:
+        for stream in (True, False):
+            total_count = kept_count = removed_count = 0
+            samples = []
+            try:
+                with open(tmp_path, "wb") as out:
+                    out.write(head)
+                    
+                    for question, answer in iter_qa_pairs(input_path, stream=stream):
+                        total_count += 1
+                        
+                        # Convert structured answer to natural language
+                        natural_answer = convert_structured_to_natural_language(question, answer)
+                        
+                        if natural_answer is None:
+                            removed_count += 1
+                            continue
+                        
+                        entry = {
+                            "question": question,
+                            "answer": natural_answer,
+                            "source": "S130_QA_ALL",
+                        }
+                        
+                        out.write(sep if kept_count else first_sep)
+                        out.write(_dumps_entry(entry, indent))
+                        kept_count += 1
+                        
+                        if len(samples) < 3:
+                            samples.append(entry)
+                    
+                    out.write(tail if kept_count else empty_tail)
+                break
+            except stream_errors as e:
+                if not stream:
+                    raise
+                # Most likely a NaN/Infinity literal: redo the pass without streaming
+                print(f"⚠️  Streaming parse failed ({str(e).splitlines()[0]}); reloading {input_path} in memory...")
+        tmp_path.replace(output_path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
     
+    print(f"📊 Original entries: {total_count}")
+    print(f"✅ Kept {kept_count} entries")
+    print(f"❌ Removed {removed_count} entries")
     print(f"💾 Saved to {output_path}")
     
     # Print sample entries
     print("\n📝 Sample entries:")
-    for i, entry in enumerate(cleaned_data[:3], 1):
+    for i, entry in enumerate(samples, 1):
         print(f"\n{i}. Q: {entry['question'][:80]}...")
         print(f"   A: {entry['answer'][:150]}...")
 
@@ -247,16 +511,20 @@ if __name__ == "__main__":
     
     # Default paths
     input_file = Path("data/S130_QA_ALL.json")
-    output_file = Path("data/prompt_engineering/S130_QA_ALL_cleaned.json")
+    output_file = Path("data/prompt_engineering/S130_QA_ALL_cleaned.jsonl")
+    
+    # --compact writes unindented JSON when the output is a .json list
+    compact = "--compact" in sys.argv
+    args = [arg for arg in sys.argv[1:] if arg != "--compact"]
     
-    if len(sys.argv) > 1:
-        input_file = Path(sys.argv[1])
-    if len(sys.argv) > 2:
-        output_file = Path(sys.argv[2])
+    if len(args) > 0:
+        input_file = Path(args[0])
+    if len(args) > 1:
+        output_file = Path(args[1])
     
     if not input_file.exists():
         print(f"❌ Error: {input_file} not found")
         sys.exit(1)
     
-    process_qa_file(input_file, output_file)
+    process_qa_file(input_file, output_file, indent=not compact)
 
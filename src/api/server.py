@@ -1,19 +1,37 @@
 """FastAPI server for RAG system."""
 
+from __future__ import annotations
+
+import json
 import os
+import threading
+import time
 import uuid
+from collections import OrderedDict
+from collections.abc import Iterator
 from contextlib import asynccontextmanager
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
 from fastapi import FastAPI, HTTPException, Request, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import StreamingResponse
+
+try:
+    from mangum import Mangum
+except ImportError:
+    Mangum = None  # Only needed for the Lambda handler
 
 from src.api.models import ChatRequest, ChatResponse, Citation, StatusResponse
-from src.retrieval.hybrid import HybridRetriever
-from src.utils.answer_generator import AnswerGenerator
 from src.utils.config import Config
 from src.utils.logging import configure_logging, get_logger, get_request_id, set_request_id
 
+if TYPE_CHECKING:
+    # Imported lazily at init: they pull in chromadb, MySQL and OpenAI clients,
+    # which dominate Lambda cold-start time
+    from src.retrieval.hybrid import HybridRetriever
+    from src.utils.answer_generator import AnswerGenerator
+
 # Configure logging
 configure_logging()
 logger = get_logger(__name__)
@@ -23,57 +41,107 @@ retriever: HybridRetriever | None = None
 config: Config | None = None
 answer_generator: AnswerGenerator | None = None
 _initialized = False
+_init_lock = threading.Lock()
+
+# When AnswerGenerator construction last failed (monotonic seconds); retried after a cooldown
+ANSWER_GENERATOR_RETRY_SECONDS = 300.0
+_answer_generator_failed_at: float | None = None
+
+# Backend probes in /v1/status are reused for this long, so health polling doesn't hit MySQL/Chroma
+STATUS_CACHE_TTL_SECONDS = 5.0
+_status_cache: dict[str, Any] = {"ts": 0.0, "corpora": None}
+
+# Retrieval results per (query, top_k) are reused for this long, so retried or
+# repeated questions don't re-run routing, SQL and vector search
+SEARCH_CACHE_TTL_SECONDS = 300.0
+SEARCH_CACHE_MAX_ENTRIES = 256
+_search_cache: OrderedDict[tuple[str, int], tuple[float, list[dict[str, Any]]]] = OrderedDict()
 
 
 def _ensure_initialized() -> None:
     """Initialize retriever on first use (Lambda container reuse)."""
-    global retriever, config, answer_generator, _initialized
+    global retriever, config, answer_generator, _initialized, _answer_generator_failed_at
     
     if _initialized:
         return
+    
+    # Double-checked so concurrent cold requests don't each load the indices
+    with _init_lock:
+        if _initialized:
+            return
         
-    logger.info("initializing_retriever")
-    try:
-        config = Config.from_env()
-        config.validate()
+        logger.info("initializing_retriever")
+        try:
+            from src.retrieval.factory import get_retriever
+            from src.utils.answer_generator import AnswerGenerator
 
-        # Use hybrid retriever (PDF via Vector DB, SAS via SQL)
-        retriever = HybridRetriever(config)
-        retriever.load()  # Load vector DB and MySQL
+            config = Config.from_env()
+            config.validate()
 
-        # Initialize answer generator
-        try:
-            answer_generator = AnswerGenerator(config)
-            logger.info("answer_generator_initialized")
+            # Use hybrid retriever (PDF via Vector DB, SAS via SQL), loaded once per process
+            retriever = get_retriever("hybrid", config)
+
+            # Initialize answer generator
+            try:
+                answer_generator = AnswerGenerator(config)
+                logger.info("answer_generator_initialized")
+            except Exception as e:
+                logger.warning("answer_generator_init_failed", error=str(e))
+                answer_generator = None
+                _answer_generator_failed_at = time.monotonic()
+
+            app.state.retriever = retriever
+            app.state.config = config
+            app.state.answer_generator = answer_generator
+
+            _initialized = True
+            logger.info("retriever_initialized", retriever_loaded=True, type="hybrid")
         except Exception as e:
-            logger.warning("answer_generator_init_failed", error=str(e))
-            answer_generator = None
+            logger.error("initialization_failed", error=str(e), exc_info=True)
+            raise
 
-        app.state.retriever = retriever
-        app.state.config = config
-        app.state.answer_generator = answer_generator
 
-        _initialized = True
-        logger.info("retriever_initialized", retriever_loaded=True, type="hybrid")
-    except Exception as e:
-        logger.error("initialization_failed", error=str(e), exc_info=True)
-        raise
+def _get_answer_generator() -> AnswerGenerator | None:
+    """
+    Return the answer generator, creating it lazily if startup could not.
+    
+    After a failed construction, requests skip the retry until
+    ANSWER_GENERATOR_RETRY_SECONDS have passed.
+    """
+    global answer_generator, _answer_generator_failed_at
+    
+    gen = answer_generator
+    if gen is None:
+        failed_at = _answer_generator_failed_at
+        if failed_at is not None and time.monotonic() - failed_at < ANSWER_GENERATOR_RETRY_SECONDS:
+            return None
+        try:
+            from src.utils.answer_generator import AnswerGenerator
+
+            gen = answer_generator = AnswerGenerator(config)
+            _answer_generator_failed_at = None
+        except Exception as e:
+            logger.warning("answer_generator_not_available", error=str(e))
+            _answer_generator_failed_at = time.monotonic()
+    return gen
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Lifespan context manager for startup and shutdown (local dev only)."""
-    global retriever, config, answer_generator
+    global retriever, config, answer_generator, _initialized, _answer_generator_failed_at
 
     # Startup
     logger.info("starting_application")
     try:
+        from src.retrieval.factory import get_retriever
+        from src.utils.answer_generator import AnswerGenerator
+
         config = Config.from_env()
         config.validate()
 
-        # Use hybrid retriever (PDF via Vector DB, SAS via SQL)
-        retriever = HybridRetriever(config)
-        retriever.load()  # Load vector DB and MySQL
+        # Use hybrid retriever (PDF via Vector DB, SAS via SQL), loaded once per process
+        retriever = get_retriever("hybrid", config)
 
         # Initialize answer generator
         try:
@@ -82,12 +150,15 @@ async def lifespan(app: FastAPI):
         except Exception as e:
             logger.warning("answer_generator_init_failed", error=str(e))
             answer_generator = None
+            _answer_generator_failed_at = time.monotonic()
 
         # Attach to app state
         app.state.retriever = retriever
         app.state.config = config
         app.state.answer_generator = answer_generator
 
+        # Requests can skip the lazy Lambda-style init path
+        _initialized = True
         logger.info("application_started", retriever_loaded=True, type="hybrid")
     except Exception as e:
         logger.error("startup_failed", error=str(e))
@@ -98,7 +169,9 @@ async def lifespan(app: FastAPI):
     # Shutdown
     logger.info("shutting_down_application")
     if retriever:
-        retriever.close()
+        from src.retrieval.factory import close_retrievers
+
+        close_retrievers()
     logger.info("application_shutdown")
 
 
@@ -121,6 +194,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress JSON responses (citation snippets make /v1/chat bodies several KB)
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+
 
 @app.middleware("http")
 async def request_id_middleware(request: Request, call_next: Any):
@@ -132,6 +208,32 @@ async def request_id_middleware(request: Request, call_next: Any):
     return response
 
 
+def _probe_corpora(ret: HybridRetriever) -> dict[str, int]:
+    """Query the vector DB count and MySQL reachability for the status endpoint."""
+    corpora: dict[str, int] = {}
+    
+    # Get PDF count from vector DB
+    pdf_retriever = ret.pdf_retriever
+    if pdf_retriever and pdf_retriever.loaded:
+        try:
+            pdf_count = pdf_retriever.vector_db.get_count()
+            corpora["pdf"] = pdf_count
+        except Exception:
+            corpora["pdf"] = -1  # Unknown count
+    
+    # Add SAS status (from MySQL)
+    mysql_client = ret.mysql_client
+    if mysql_client:
+        try:
+            # Test connection to see if SAS is available
+            if mysql_client.test_connection():
+                corpora["sas"] = -1  # -1 indicates SQL-based (unknown count)
+        except Exception:
+            pass  # MySQL not available
+    
+    return corpora
+
+
 @app.get("/v1/status", response_model=StatusResponse)
 async def get_status() -> StatusResponse:
     """Get status of the RAG system."""
@@ -147,7 +249,8 @@ async def get_status() -> StatusResponse:
         # Return status even if initialization failed
         pass
     
-    if not retriever or not retriever.loaded:
+    ret = retriever
+    if not ret or not ret.loaded:
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             detail="Retriever not initialized or indices not loaded",
@@ -155,63 +258,121 @@ async def get_status() -> StatusResponse:
 
     # Get status from retrievers
     manifest_version = "vector_db"  # Vector DB doesn't use manifest versioning
-    corpora: dict[str, int] = {}
-    
-    # Get PDF count from vector DB
-    if retriever.pdf_retriever and retriever.pdf_retriever.loaded:
-        try:
-            pdf_count = retriever.pdf_retriever.vector_db.get_count()
-            corpora["pdf"] = pdf_count
-        except Exception:
-            corpora["pdf"] = -1  # Unknown count
     
-    # Add SAS status (from MySQL)
-    if retriever.mysql_client:
-        try:
-            # Test connection to see if SAS is available
-            if retriever.mysql_client.test_connection():
-                corpora["sas"] = -1  # -1 indicates SQL-based (unknown count)
-        except Exception:
-            pass  # MySQL not available
+    cache = _status_cache
+    now = time.monotonic()
+    corpora: dict[str, int] | None = cache["corpora"]
+    if corpora is None or now - cache["ts"] >= STATUS_CACHE_TTL_SECONDS:
+        corpora = _probe_corpora(ret)
+        cache["corpora"] = corpora
+        cache["ts"] = now
 
     return StatusResponse(
         retriever="hybrid" if config else "unknown",
         manifest_version=manifest_version,
         corpora=corpora,
-        loaded=retriever.loaded,
+        loaded=ret.loaded,
     )
 
 
-@app.post("/v1/chat", response_model=ChatResponse)
-async def chat(request: ChatRequest) -> ChatResponse:
-    """
-    Chat endpoint that searches corpora and returns answer with citations.
-
-    Args:
-        request: Chat request with query
-
-    Returns:
-        Chat response with answer and citations
-    """
+def _get_loaded_retriever() -> HybridRetriever:
+    """Initialize on first use and return the retriever, or raise 503 if unavailable."""
     _ensure_initialized()
     
-    if not retriever:
+    ret = retriever
+    if not ret:
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             detail="Retriever not initialized",
         )
 
-    if not retriever.loaded:
+    if not ret.loaded:
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             detail="Indices not loaded",
         )
+    return ret
+
+
+async def _cached_search(ret: HybridRetriever, query: str, top_k: int) -> list[dict[str, Any]]:
+    """
+    Search via the retriever, reusing results for the same query within the TTL.
+
+    Only touched from the event loop, so no lock is needed; least recently
+    used entries are evicted beyond SEARCH_CACHE_MAX_ENTRIES. Callers get their
+    own copy of the result list.
+    """
+    key = (query, top_k)
+    hit = _search_cache.get(key)
+    if hit is not None and time.monotonic() - hit[0] < SEARCH_CACHE_TTL_SECONDS:
+        _search_cache.move_to_end(key)
+        return list(hit[1])
+
+    results = await ret.asearch(query, top_k=top_k)
+    # Empty results may come from a failing backend, so only real answers are cached
+    if results:
+        _search_cache[key] = (time.monotonic(), list(results))
+        _search_cache.move_to_end(key)
+        if len(_search_cache) > SEARCH_CACHE_MAX_ENTRIES:
+            _search_cache.popitem(last=False)
+    return results
+
+
+def _fallback_answer(top_results: list[dict[str, Any]]) -> str:
+    """Simple concatenation of the top chunks, used when GPT is not available."""
+    logger.warning("using_fallback_answer_generation")
+    answer_parts = []
+    for result in top_results[:5]:
+        text = result.get("text", "").strip()
+        if text:
+            # Truncate long chunks
+            if len(text) > 500:
+                text = text[:500] + "..."
+            answer_parts.append(text)
+    
+    if answer_parts:
+        return "\n\n".join(answer_parts)
+    return "I found relevant documents, but couldn't extract a clear answer. Please check the sources below for more details."
+
+
+def _build_citations(top_results: list[dict[str, Any]]) -> list[Citation]:
+    """Build citations (internally produced data, so skip per-field validation)."""
+    return [
+        Citation.model_construct(
+            corpus=r.get("corpus", ""),
+            chunk_id=r.get("chunk_id", ""),
+            score=r.get("score", 0.0),
+            snippet=(r.get("text") or "")[:300],  # Truncate for display
+        )
+        for r in top_results
+    ]
+
+
+def _sse_event(payload: dict[str, Any]) -> str:
+    """Format one server-sent event carrying a JSON payload."""
+    return f"data: {json.dumps(payload, ensure_ascii=False)}\n\n"
+
+
+@app.post("/v1/chat", response_model=ChatResponse)
+async def chat(request: ChatRequest) -> ChatResponse:
+    """
+    Chat endpoint that searches corpora and returns answer with citations.
+
+    Args:
+        request: Chat request with query
+
+    Returns:
+        Chat response with answer and citations
+    """
+    # Bind module globals once for the rest of the request
+    ret = _get_loaded_retriever()
+    cfg = config
 
-    top_k = request.top_k or (config.top_k if config else 5)
+    top_k = request.top_k or (cfg.top_k if cfg else 5)
 
     try:
         # Search
-        results = retriever.search(request.query, top_k=top_k)
+        results = await _cached_search(ret, request.query, top_k)
 
         if not results:
             return ChatResponse(
@@ -219,50 +380,23 @@ async def chat(request: ChatRequest) -> ChatResponse:
                 citations=[],
             )
 
+        # Top 10 results feed both the answer context and the citations
+        top_results = results[:10]
+
         # Use GPT to generate answer from retrieved context
-        global answer_generator
-        if answer_generator is None:
-            try:
-                answer_generator = AnswerGenerator(config)
-            except Exception as e:
-                logger.warning("answer_generator_not_available", error=str(e))
-                answer_generator = None
+        gen = _get_answer_generator()
 
-        if answer_generator:
+        if gen:
             # Generate answer using GPT
-            top_results = results[:10]  # Use top 10 for context
-            answer = answer_generator.generate(
+            answer = gen.generate(
                 query=request.query,
                 context_chunks=top_results,
             )
         else:
             # Fallback: simple concatenation if GPT not available
-            logger.warning("using_fallback_answer_generation")
-            top_results = results[:5]
-            answer_parts = []
-            for result in top_results:
-                text = result.get("text", "").strip()
-                if text:
-                    # Truncate long chunks
-                    if len(text) > 500:
-                        text = text[:500] + "..."
-                    answer_parts.append(text)
-            
-            if answer_parts:
-                answer = "\n\n".join(answer_parts)
-            else:
-                answer = "I found relevant documents, but couldn't extract a clear answer. Please check the sources below for more details."
-
-        # Build citations
-        citations = [
-            Citation(
-                corpus=r.get("corpus", ""),
-                chunk_id=r.get("chunk_id", ""),
-                score=r.get("score", 0.0),
-                snippet=r.get("text", "")[:300],  # Truncate for display
-            )
-            for r in results[:10]  # Top 10 citations
-        ]
+            answer = _fallback_answer(top_results)
+
+        citations = _build_citations(top_results)
 
         logger.info(
             "chat_request_completed",
@@ -271,7 +405,7 @@ async def chat(request: ChatRequest) -> ChatResponse:
             citations_count=len(citations),
         )
 
-        return ChatResponse(answer=answer, citations=citations)
+        return ChatResponse.model_construct(answer=answer, citations=citations)
 
     except Exception as e:
         logger.error("chat_request_failed", error=str(e), query_preview=request.query[:50])
@@ -281,6 +415,77 @@ async def chat(request: ChatRequest) -> ChatResponse:
         )
 
 
+@app.post("/v1/chat/stream")
+async def chat_stream(request: ChatRequest) -> StreamingResponse:
+    """
+    Streaming chat endpoint (server-sent events).
+
+    Emits ``token`` events with answer text as it is generated, then one
+    ``citations`` event and a final ``done`` event. An ``error`` event is
+    sent if generation fails after the stream has started.
+
+    Args:
+        request: Chat request with query
+
+    Returns:
+        Event stream response
+    """
+    ret = _get_loaded_retriever()
+    cfg = config
+
+    top_k = request.top_k or (cfg.top_k if cfg else 5)
+
+    try:
+        results = await _cached_search(ret, request.query, top_k)
+    except Exception as e:
+        logger.error("chat_request_failed", error=str(e), query_preview=request.query[:50])
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Search failed: {str(e)}",
+        )
+
+    top_results = results[:10]
+    gen = _get_answer_generator() if results else None
+    query = request.query
+
+    def events() -> Iterator[str]:
+        try:
+            if not results:
+                yield _sse_event(
+                    {"type": "token", "text": "No relevant documents found for your query."}
+                )
+            elif gen:
+                for text in gen.generate_stream(query=query, context_chunks=top_results):
+                    yield _sse_event({"type": "token", "text": text})
+            else:
+                yield _sse_event({"type": "token", "text": _fallback_answer(top_results)})
+        except Exception as e:
+            logger.error("chat_stream_failed", error=str(e), query_preview=query[:50])
+            yield _sse_event({"type": "error", "detail": f"Answer generation failed: {str(e)}"})
+
+        citations = _build_citations(top_results)
+        yield _sse_event(
+            {"type": "citations", "citations": [c.model_dump() for c in citations]}
+        )
+        yield _sse_event({"type": "done"})
+
+        logger.info(
+            "chat_request_completed",
+            query_preview=query[:50],
+            results_count=len(results),
+            citations_count=len(citations),
+            streamed=True,
+        )
+
+    # Sync generator: Starlette iterates it in a worker thread, so the blocking
+    # OpenAI stream doesn't stall the event loop
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @app.get("/")
 async def root() -> dict[str, Any]:
     """Root endpoint - API information."""
@@ -300,13 +505,16 @@ async def health() -> dict[str, str]:
     return {"status": "ok"}
 
 
-# Lambda handler for AWS SAM
+# Lambda handler for AWS SAM, built once per container and reused across warm invocations
+# (lifespan is off; initialization happens lazily in _ensure_initialized)
+_asgi_handler = Mangum(app, lifespan="off") if Mangum is not None else None
+
+
 def handler(event: dict[str, Any], context: Any) -> dict[str, Any]:
     """AWS Lambda handler for FastAPI app."""
-    from mangum import Mangum
-
-    asgi_handler = Mangum(app, lifespan="off")  # Lifespan handled by Lambda
-    return asgi_handler(event, context)
+    if _asgi_handler is None:
+        raise ImportError("mangum not installed. Install with: pip install mangum")
+    return _asgi_handler(event, context)
 
 
 if __name__ == "__main__":
@@ -2,7 +2,10 @@
 
 from typing import Any
 
-from pydantic import BaseModel, Field, field_validator
+from pydantic import BaseModel, Field, TypeAdapter, field_validator
+
+# Files every corpus must ship; shared across validations instead of rebuilt per entry
+_REQUIRED_FILES = frozenset({"index.faiss", "ids.jsonl", "docs.jsonl"})
 
 
 class CorpusEntry(BaseModel):
@@ -17,9 +20,8 @@ class CorpusEntry(BaseModel):
     @classmethod
     def validate_files(cls, v: list[str]) -> list[str]:
         """Ensure required files are present."""
-        required = {"index.faiss", "ids.jsonl", "docs.jsonl"}
-        if not required.issubset(set(v)):
-            raise ValueError(f"Missing required files. Must include: {required}")
+        if not _REQUIRED_FILES.issubset(v):
+            raise ValueError(f"Missing required files. Must include: {sorted(_REQUIRED_FILES)}")
         return v
 
 
@@ -29,6 +31,11 @@ class Manifest(BaseModel):
     version: str = Field(..., description="Version identifier (e.g., v20251101)")
     corpora: dict[str, CorpusEntry] = Field(..., description="Corpus entries keyed by name (pdf, sas)")
 
+    @classmethod
+    def parse_json(cls, data: str | bytes) -> "Manifest":
+        """Validate raw manifest JSON straight into a Manifest (no intermediate dict)."""
+        return _MANIFEST_ADAPTER.validate_json(data)
+
     def get_corpus(self, name: str) -> CorpusEntry:
         """Get corpus entry by name, raising if not found."""
         if name not in self.corpora:
@@ -39,3 +46,6 @@ class Manifest(BaseModel):
         """Serialize to dict for JSON."""
         return self.model_dump(mode="json")
 
+
+# Built once; reused by Manifest.parse_json for every manifest load
+_MANIFEST_ADAPTER = TypeAdapter(Manifest)
@@ -0,0 +1,82 @@
+"""Login and trial selection carried in the URL so a page refresh keeps them.
+
+Streamlit starts a fresh session_state on refresh. The signed auth token and
+selected trial are mirrored into st.query_params and restored from there, so
+a refreshed page doesn't bounce back to the login form.
+"""
+
+import base64
+import hashlib
+import hmac
+import os
+import secrets
+import time
+
+import streamlit as st
+
+# Tokens are signed with FRONTEND_SESSION_SECRET; without it a per-process key
+# is used, so tokens survive refreshes but not a frontend restart
+_SECRET = (os.getenv("FRONTEND_SESSION_SECRET") or secrets.token_hex(32)).encode()
+AUTH_TOKEN_TTL_SECONDS = 12 * 60 * 60
+
+
+def _sign(payload: str) -> str:
+    return hmac.new(_SECRET, payload.encode(), hashlib.sha256).hexdigest()[:32]
+
+
+def issue_auth_token(username: str) -> str:
+    """Create a signed token for username."""
+    user = base64.urlsafe_b64encode(username.encode()).decode().rstrip("=")
+    payload = f"{user}.{int(time.time())}"
+    return f"{payload}.{_sign(payload)}"
+
+
+def verify_auth_token(token: str) -> str | None:
+    """Return the username for a valid, unexpired token, else None."""
+    try:
+        user, issued, signature = token.split(".")
+        payload = f"{user}.{issued}"
+        if not hmac.compare_digest(signature, _sign(payload)):
+            return None
+        if time.time() - int(issued) > AUTH_TOKEN_TTL_SECONDS:
+            return None
+        return base64.urlsafe_b64decode(user + "=" * (-len(user) % 4)).decode()
+    except ValueError:
+        return None
+
+
+def sync_session() -> None:
+    """
+    Keep login and selected trial in sync with the URL.
+    
+    On a fresh session (page refresh) they are restored from the query
+    params; otherwise the current values are written back, since page
+    switches clear the query string.
+    """
+    params = st.query_params
+    if not st.session_state.get("authenticated"):
+        username = verify_auth_token(params["auth"]) if "auth" in params else None
+        if username is None:
+            return
+        st.session_state.authenticated = True
+        st.session_state.username = username
+        st.session_state.auth_token = params["auth"]
+        if "trial" in params:
+            st.session_state.selected_trial = params["trial"]
+        return
+    
+    token = st.session_state.get("auth_token")
+    if token and params.get("auth") != token:
+        params["auth"] = token
+    trial = st.session_state.get("selected_trial")
+    if trial and params.get("trial") != trial:
+        params["trial"] = trial
+
+
+def log_out() -> None:
+    """Clear the login and selection and return to the login page."""
+    st.session_state.authenticated = False
+    st.session_state.pop("auth_token", None)
+    st.session_state.selected_trial = None
+    st.query_params.clear()
+    st.switch_page("pages/login.py")
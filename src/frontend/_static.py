@@ -0,0 +1,27 @@
+"""Shared stylesheet loading for the Streamlit pages.
+
+Pages import this as a plain module (Streamlit puts the app directory on
+sys.path), so it is executed once per process rather than on every rerun.
+"""
+
+from pathlib import Path
+
+import streamlit as st
+
+STATIC_DIR = Path(__file__).resolve().parent / "static"
+
+
+@st.cache_data(show_spinner=False)
+def load_css(name: str) -> str:
+    """Read a stylesheet from the frontend static directory (cached per process)."""
+    return (STATIC_DIR / name).read_text(encoding="utf-8")
+
+
+def inject_css(name: str) -> None:
+    """
+    Inject a stylesheet from the frontend static directory into the page.
+
+    Sent through st.html rather than st.markdown so the browser inserts it
+    directly instead of running it through the markdown renderer each rerun.
+    """
+    st.html(f"<style>{load_css(name)}</style>")
@@ -2,6 +2,8 @@
 
 import streamlit as st
 
+from _session import sync_session
+
 st.set_page_config(
     page_title="CoTrial RAG",
     page_icon="💬",
@@ -9,8 +11,14 @@ st.set_page_config(
     initial_sidebar_state="collapsed",
 )
 
-# Redirect to login if not authenticated, otherwise to trials
-if "authenticated" not in st.session_state or not st.session_state.authenticated:
-    st.switch_page("pages/login.py")
-else:
-    st.switch_page("pages/trials.py")
+
+def _route() -> None:
+    """Redirect to login if not authenticated, otherwise to trials."""
+    sync_session()
+    if st.session_state.get("authenticated"):
+        st.switch_page("pages/trials.py")
+    else:
+        st.switch_page("pages/login.py")
+
+
+_route()
@@ -1,10 +1,19 @@
 """Streamlit frontend for CoTrial RAG v2."""
 
+import json
 import os
+import random
+import time
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import Any
 
 import requests
 import streamlit as st
+from requests.adapters import HTTPAdapter
+
+from _session import log_out, sync_session
+from _static import inject_css
 
 # Page config
 st.set_page_config(
@@ -21,6 +30,37 @@ API_URL = os.getenv(
     "http://localhost:8000",
 )
 
+# Retry backoff (seconds): exponential from a per-error base, capped, with jitter
+RETRY_BASE_DELAY_TIMEOUT = 0.5
+RETRY_BASE_DELAY_GATEWAY = 1.5
+RETRY_MAX_DELAY = 8.0
+
+# Chat history is rendered in windows of this many messages
+HISTORY_WINDOW_SIZE = 20
+
+# Rolling cap on stored messages; only the newest keep full citation snippets
+MAX_HISTORY_MESSAGES = 100
+FULL_CITATION_MESSAGES = 20
+
+# Citation accent colour per corpus
+_CORPUS_COLORS: dict[str, str] = {
+    'PDF': '#8B4513',
+    'SAS': '#2C5F8D',
+    'CONTEXT': '#6B4E9B',
+}
+_CITATION_DEFAULT_COLOR = '#5A6C7D'
+
+# One disclosure block per citation: index, corpus, score, body HTML
+_CITATION_DETAILS_TMPL = (
+    '<details class="citation"><summary>Source %d: %s (Relevance: %.3f)</summary>%s</details>'
+)
+
+# Header shown above a turn's citations
+_REFERENCED_SOURCES_HTML = (
+    '<div style="margin-top: 2rem; padding-top: 2rem; border-top: 3px solid rgba(139, 69, 19, 0.3);">'
+    '<h4 style="color: #000000; font-size: 1.3rem; font-weight: 700; margin-bottom: 1.5rem; letter-spacing: 0.3px;">'
+    'Referenced Sources</h4></div>'
+)
 
 def initialize_session_state() -> None:
     """Initialize session state variables."""
@@ -28,15 +68,42 @@ def initialize_session_state() -> None:
         st.session_state.messages = []
     if "api_url" not in st.session_state:
         st.session_state.api_url = API_URL
+    if "history_window" not in st.session_state:
+        st.session_state.history_window = HISTORY_WINDOW_SIZE
+
+
+def get_http_session() -> requests.Session:
+    """
+    Get the keep-alive HTTP session for the current API URL.
+    
+    Stored in session state so reruns keep reusing the same pooled
+    connection (and TLS session) instead of reconnecting on every request.
+    """
+    api_url = st.session_state.api_url
+    session = st.session_state.get("http_session")
+    if session is None or st.session_state.get("http_session_url") != api_url:
+        if session is not None:
+            session.close()
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=8, max_retries=0)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        session.headers.update({"Accept-Encoding": "gzip, deflate"})
+        st.session_state.http_session = session
+        st.session_state.http_session_url = api_url
+    return session
+
+
+def _backoff_delay(base: float, attempt: int) -> float:
+    """Exponential backoff with jitter, so concurrent clients don't retry in lockstep."""
+    return min(RETRY_MAX_DELAY, base * (2 ** attempt)) * random.uniform(0.5, 1.5)
 
 
 def send_message(query: str, retry_count: int = 2) -> dict[str, Any] | None:
     """Send a message to the RAG API with retry logic."""
-    import time
-    
     for attempt in range(retry_count + 1):
         try:
-            response = requests.post(
+            response = get_http_session().post(
                 f"{st.session_state.api_url}/v1/chat",
                 json={"query": query, "top_k": 5},
                 timeout=35,
@@ -46,7 +113,7 @@ def send_message(query: str, retry_count: int = 2) -> dict[str, Any] | None:
         except requests.exceptions.Timeout:
             if attempt < retry_count:
                 st.info(f"⏳ Request timed out. Retrying... (attempt {attempt + 2}/{retry_count + 1})")
-                time.sleep(2)
+                time.sleep(_backoff_delay(RETRY_BASE_DELAY_TIMEOUT, attempt))
                 continue
             else:
                 st.warning(
@@ -57,10 +124,13 @@ def send_message(query: str, retry_count: int = 2) -> dict[str, Any] | None:
                 return None
         except requests.exceptions.RequestException as e:
             error_str = str(e)
-            if "504" in error_str or "Gateway Timeout" in error_str:
+            response = getattr(e, "response", None)
+            status_code = response.status_code if response is not None else None
+            
+            if status_code == 504 or "504" in error_str or "Gateway Timeout" in error_str:
                 if attempt < retry_count:
                     st.info(f"⏳ Gateway timeout. Retrying... (attempt {attempt + 2}/{retry_count + 1})")
-                    time.sleep(3)
+                    time.sleep(_backoff_delay(RETRY_BASE_DELAY_GATEWAY, attempt))
                     continue
                 else:
                     st.warning(
@@ -69,569 +139,295 @@ def send_message(query: str, retry_count: int = 2) -> dict[str, Any] | None:
                         "The next request should work! You can also use the '🔥 Warm Up API' button in the sidebar."
                     )
                     return None
-            else:
-                st.error(f"Error: {error_str}")
-                if hasattr(e, "response") and e.response is not None:
-                    try:
-                        error_detail = e.response.json()
-                        st.error(f"Details: {error_detail}")
-                    except Exception:
-                        st.error(f"Status: {e.response.status_code}")
-                return None
+            
+            # Other server errors and dropped connections are transient; 4xx are not
+            retryable = (
+                isinstance(e, requests.exceptions.ConnectionError)
+                or (status_code is not None and status_code >= 500)
+            )
+            if retryable and attempt < retry_count:
+                st.info(f"⏳ Server error. Retrying... (attempt {attempt + 2}/{retry_count + 1})")
+                time.sleep(_backoff_delay(RETRY_BASE_DELAY_GATEWAY, attempt))
+                continue
+            
+            st.error(f"Error: {error_str}")
+            if response is not None:
+                try:
+                    error_detail = response.json()
+                    st.error(f"Details: {error_detail}")
+                except Exception:
+                    st.error(f"Status: {response.status_code}")
+            return None
     return None
 
 
-def warm_up_api() -> bool:
-    """Warm up the API by making a health check request."""
+def send_message_stream(query: str) -> Iterator[dict[str, Any]]:
+    """
+    Stream an answer from the RAG API as server-sent events.
+    
+    Yields decoded events in order: "token" (answer text fragment),
+    "citations", optional "error", and a final "done". Raises
+    requests.RequestException if the stream can't be opened or breaks.
+    """
+    with get_http_session().post(
+        f"{st.session_state.api_url}/v1/chat/stream",
+        json={"query": query, "top_k": 5},
+        headers={"Accept-Encoding": "identity"},  # don't let a compressor buffer the stream
+        stream=True,
+        timeout=(5, 120),
+    ) as response:
+        response.raise_for_status()
+        for line in response.iter_lines(decode_unicode=True):
+            if not line or not line.startswith("data:"):
+                continue
+            event = json.loads(line[5:].strip())
+            yield event
+            if event.get("type") == "done":
+                return
+
+
+def _trim_history() -> None:
+    """Cap stored messages and drop citation snippets from older turns."""
+    messages = st.session_state.messages
+    if len(messages) > MAX_HISTORY_MESSAGES:
+        del messages[:-MAX_HISTORY_MESSAGES]
+        # Message count no longer tracks content once the head is dropped
+        st.session_state.pop("_recent_cache_len", None)
+    for msg in messages[:-FULL_CITATION_MESSAGES]:
+        citations = msg.get("citations")
+        if citations and "snippet" in citations[0]:
+            msg["citations"] = [
+                {"chunk_id": c.get("chunk_id"), "corpus": c.get("corpus"), "score": c.get("score")}
+                for c in citations
+            ]
+
+
+def get_recent_queries(limit: int = 3) -> list[str]:
+    """
+    Return the most recent distinct user queries, newest first.
+    
+    The list is cached in session state and only rebuilt when the message
+    count changes.
+    """
+    messages = st.session_state.messages
+    if st.session_state.get("_recent_cache_len") != len(messages):
+        seen: set[str] = set()
+        recent: list[str] = []
+        for msg in reversed(messages):
+            if msg["role"] == "user" and msg["content"] not in seen:
+                seen.add(msg["content"])
+                recent.append(msg["content"])
+                if len(recent) == limit:
+                    break
+        st.session_state._recent = recent
+        st.session_state._recent_cache_len = len(messages)
+    return st.session_state._recent
+
+
+def _probe_api(session: requests.Session, api_url: str) -> bool:
+    """
+    Probe /health and /v1/status concurrently.
+    
+    The quick /health probe fails fast when the API is unreachable; /v1/status
+    (which may wait for the retriever to load) decides readiness. Takes the
+    session and URL explicitly so it can run off the script thread.
+    """
+    executor = ThreadPoolExecutor(max_workers=2)
     try:
-        health_response = requests.get(
-            f"{st.session_state.api_url}/health",
-            timeout=10
-        )
-        if health_response.status_code == 200:
-            status_response = requests.get(
-                f"{st.session_state.api_url}/v1/status",
-                timeout=35
-            )
-            return status_response.status_code == 200
-        return False
-    except Exception:
+        health = executor.submit(session.get, f"{api_url}/health", timeout=(3, 10))
+        status = executor.submit(session.get, f"{api_url}/v1/status", timeout=(3, 35))
+        for future in as_completed((health, status)):
+            try:
+                ok = future.result().status_code == 200
+            except requests.exceptions.RequestException:
+                ok = False
+            if future is status or not ok:
+                return ok
         return False
+    finally:
+        # Don't block on the slower probe once the outcome is known
+        executor.shutdown(wait=False, cancel_futures=True)
 
 
-def display_citation(citation: dict[str, Any], index: int) -> None:
-    """Display a citation in an expandable section with elegant styling."""
-    corpus = citation.get('corpus', 'unknown').upper()
-    score = citation.get('score', 0)
-    
-    corpus_colors = {
-        'PDF': '#8B4513',
-        'SAS': '#2C5F8D',
-        'CONTEXT': '#6B4E9B',
-    }
-    color = corpus_colors.get(corpus, '#5A6C7D')
+def warm_up_api() -> bool:
+    """Warm up the API by probing health and status concurrently."""
+    return _probe_api(get_http_session(), st.session_state.api_url)
+
+
+@st.cache_resource
+def _background_executor() -> ThreadPoolExecutor:
+    """Process-wide worker pool for background API calls."""
+    return ThreadPoolExecutor(max_workers=2, thread_name_prefix="api-warmup")
+
+
+def start_background_warm_up() -> None:
+    """
+    Start warming the API once per session without blocking the page.
     
-    # Use proper arrow icon instead of text
-    with st.expander(
-        f"Source {index + 1}: {corpus} (Relevance: {score:.3f})",
-        expanded=False,
-    ):
-        st.markdown(
-            f"""
+    A cold API loads its retriever on first use, so probing while the user
+    is still typing overlaps that load with composing the first question.
+    """
+    api_url = st.session_state.api_url
+    if st.session_state.get("warm_up_url") == api_url:
+        return
+    st.session_state.warm_up_url = api_url
+    st.session_state.warm_up_future = _background_executor().submit(
+        _probe_api, get_http_session(), api_url
+    )
+
+
+@st.cache_data(max_entries=512, show_spinner=False)
+def _render_citation_html(color: str, snippet: str, chunk_id: str) -> str:
+    """Build the citation body HTML (cached by content across reruns)."""
+    return f"""
             <div style="padding: 1.25rem 1.5rem; background: rgba(253, 250, 246, 0.95); border-left: 4px solid {color}; margin: 1rem 0; border-radius: 8px; box-shadow: 0 2px 8px rgba(0, 0, 0, 0.08);">
                 <p style="color: #000000; line-height: 1.9; margin-bottom: 1rem; font-size: 1.1rem; font-weight: 400;">
-                    {citation.get("snippet", "No snippet available")}
+                    {snippet}
                 </p>
                 <p style="color: #000000; font-size: 0.95rem; margin: 0; font-weight: 400;">
-                    <strong>Document ID:</strong> {citation.get('chunk_id', 'N/A')}
+                    <strong>Document ID:</strong> {chunk_id}
                 </p>
             </div>
-            """,
-            unsafe_allow_html=True,
-        )
+            """
 
 
-def main() -> None:
-    """Main Streamlit app."""
-    if "authenticated" not in st.session_state or not st.session_state.authenticated:
-        st.switch_page("pages/login.py")
-    
-    initialize_session_state()
+def _render_all_citations_html(citations: list[dict[str, Any]]) -> str:
+    """Build native <details> disclosure blocks for all citations of a turn."""
+    parts = []
+    for index, citation in enumerate(citations):
+        corpus = citation.get('corpus', 'unknown').upper()
+        score = citation.get('score', 0)
+        color = _CORPUS_COLORS.get(corpus, _CITATION_DEFAULT_COLOR)
+        body = _render_citation_html(
+            color,
+            citation.get("snippet", "No snippet available"),
+            str(citation.get('chunk_id', 'N/A')),
+        ).strip()
+        parts.append(_CITATION_DETAILS_TMPL % (index + 1, corpus, score, body))
+    return "".join(parts)
 
-    # Enhanced formal and rich styling
+
+def _render_refs_header() -> None:
+    """Display the "Referenced Sources" header above a turn's citations."""
+    st.markdown(_REFERENCED_SOURCES_HTML, unsafe_allow_html=True)
+
+
+def display_citations(citations: list[dict[str, Any]]) -> None:
+    """Display all citations of a turn with a single markdown element."""
+    st.markdown(_render_all_citations_html(citations), unsafe_allow_html=True)
+
+
+@st.fragment
+def _render_sidebar() -> None:
+    """
+    Render the sidebar as a fragment.
+    
+    Sidebar interactions rerun only this fragment; actions that change the
+    conversation call st.rerun() to refresh the whole page.
+    """
     st.markdown(
         """
-        <style>
-        /* Elegant serif typography */
-        * {
-            font-family: "Baskerville", "Libre Baskerville", "Times New Roman", serif !important;
-        }
-        
-        /* Rich gradient background - deep burgundy to warm cream */
-        .stApp {
-            background: linear-gradient(135deg, #8B4513 0%, #A0522D 50%, #CD853F 100%);
-            background-attachment: fixed;
-        }
-        
-        /* Sidebar - sophisticated dark wood panel aesthetic */
-        [data-testid="stSidebar"] {
-            background: linear-gradient(180deg, #1a1a1a 0%, #2d2d2d 100%) !important;
-            border-right: 2px solid rgba(205, 133, 63, 0.3);
-            box-shadow: 4px 0 20px rgba(0, 0, 0, 0.5);
-        }
-        
-        [data-testid="stSidebar"] * {
-            color: #F5E6D3 !important;
-        }
-        
-        /* Main content container - premium parchment */
-        .main {
-            background: transparent;
-            padding: 0 !important;
-            margin: 0 !important;
-        }
-        
-        /* Center all content perfectly */
-        .main .block-container {
-            background: transparent;
-            padding: 0 !important;
-            margin: 0 auto !important;
-            max-width: 900px !important;
-            display: flex;
-            flex-direction: column;
-            align-items: center;
-            justify-content: flex-start;
-            min-height: 100vh;
-        }
-        
-        /* Chat messages container - centered with max width */
-        [data-testid="stVerticalBlock"] {
-            max-width: 900px !important;
-            width: 100% !important;
-            margin: 0 auto !important;
-            padding: 2rem 3rem !important;
-            padding-bottom: 8rem !important; /* Space for fixed input */
-        }
-        
-        /* Remove greeting section - causing display issues */
-        .greeting-section {
-            display: none !important;
-        }
-        
-        /* Chat messages - elegant cards with centered layout */
-        .stChatMessage {
-            background: rgba(253, 250, 246, 0.98) !important;
-            border: 2px solid rgba(139, 69, 19, 0.2) !important;
-            border-radius: 12px;
-            padding: 2rem 2.5rem !important;
-            margin: 1.5rem auto !important;
-            max-width: 900px !important;
-            width: 100% !important;
-            box-shadow: 0 4px 20px rgba(0, 0, 0, 0.12);
-            backdrop-filter: blur(10px);
-        }
-        
-        /* User messages - distinguished styling */
-        .stChatMessage[data-testid="user"] {
-            background: rgba(245, 238, 220, 0.98) !important;
-            border-left: 4px solid #8B4513 !important;
-        }
-        
-        /* Assistant messages */
-        .stChatMessage[data-testid="assistant"] {
-            background: rgba(255, 255, 255, 0.98) !important;
-            border-left: 4px solid #CD853F !important;
-        }
-        
-        /* Message text - clear and readable */
-        .stChatMessage p,
-        .stChatMessage div {
-            color: #000000 !important;
-            font-size: 1.1rem !important;
-            line-height: 1.8 !important;
-            font-weight: 400 !important;
-        }
-        
-        /* Message avatars */
-        .stChatMessage [data-testid="stChatAvatar"] {
-            background: linear-gradient(135deg, #8B4513 0%, #A0522D 100%) !important;
-            color: #F5E6D3 !important;
-            font-weight: 600 !important;
-        }
-        
-        /* Chat input - centered and elegant */
-        [data-testid="stChatInput"] {
-            position: fixed !important;
-            bottom: 2rem !important;
-            left: 50% !important;
-            transform: translateX(-50%) !important;
-            width: 800px !important;
-            max-width: calc(100vw - 350px) !important;
-            z-index: 1000 !important;
-            margin-left: 125px !important; /* Account for sidebar */
-        }
-        
-        /* Ensure input doesn't overlap with messages */
-        [data-testid="stChatInputContainer"] {
-            padding-bottom: 0 !important;
-            max-width: 900px !important;
-            margin: 0 auto !important;
-        }
-        
-        .stChatInput {
-            background: rgba(253, 250, 246, 0.98) !important;
-            border: 2px solid rgba(139, 69, 19, 0.3) !important;
-            border-radius: 16px !important;
-            box-shadow: 0 8px 32px rgba(0, 0, 0, 0.15) !important;
-            backdrop-filter: blur(10px) !important;
-        }
-        
-        .stChatInput input {
-            background: transparent !important;
-            border: none !important;
-            font-size: 1.1rem !important;
-            padding: 1.25rem 2rem !important;
-            color: #000000 !important;
-        }
-        
-        .stChatInput input::placeholder {
-            color: #666666 !important;
-            font-style: italic;
-        }
-        
-        /* Buttons - luxurious gold accent */
-        .stButton > button {
-            background: linear-gradient(135deg, #8B4513 0%, #A0522D 100%) !important;
-            color: #F5E6D3 !important;
-            border: 2px solid rgba(205, 133, 63, 0.4) !important;
-            border-radius: 10px !important;
-            font-size: 1rem !important;
-            font-weight: 600 !important;
-            padding: 0.9rem 2rem !important;
-            transition: all 0.3s ease !important;
-            box-shadow: 0 4px 15px rgba(139, 69, 19, 0.3) !important;
-            letter-spacing: 0.5px;
-        }
-        
-        .stButton > button:hover {
-            transform: translateY(-2px) !important;
-            box-shadow: 0 6px 25px rgba(139, 69, 19, 0.5) !important;
-            border-color: rgba(205, 133, 63, 0.7) !important;
-            background: linear-gradient(135deg, #A0522D 0%, #CD853F 100%) !important;
-        }
-        
-        /* Sidebar branding */
-        .sidebar-brand {
-            background: linear-gradient(135deg, #8B4513 0%, #A0522D 100%);
-            padding: 1.5rem;
-            margin: -1rem -1rem 2rem -1rem;
-            border-bottom: 2px solid rgba(205, 133, 63, 0.5);
-            box-shadow: 0 4px 15px rgba(0, 0, 0, 0.3);
-        }
-        
-        .sidebar-brand h2 {
-            color: #F5E6D3 !important;
-            font-size: 1.8rem !important;
-            font-weight: 600 !important;
-            margin: 0 !important;
-            letter-spacing: 1px;
-            text-shadow: 2px 2px 4px rgba(0, 0, 0, 0.3);
-        }
-        
-        /* Expanders - refined styling */
-        .streamlit-expanderHeader {
-            background: linear-gradient(135deg, #F5E6D3 0%, #F8F4EE 100%) !important;
-            border: 1px solid rgba(139, 69, 19, 0.2) !important;
-            border-radius: 10px !important;
-            padding: 1rem 1.5rem !important;
-            font-weight: 600 !important;
-            color: #000000 !important;
-            font-size: 1.05rem !important;
-            box-shadow: 0 2px 8px rgba(0, 0, 0, 0.05);
-        }
-        
-        /* Hide ALL icon-related elements and text */
-        .streamlit-expanderHeader [class*="icon"],
-        .streamlit-expanderHeader [data-icon],
-        .streamlit-expanderHeader .material-icons,
-        .streamlit-expanderHeader [class*="material"],
-        .streamlit-expanderHeader span[class*="icon"],
-        .streamlit-expanderHeader svg,
-        .streamlit-expanderHeader i {
-            display: none !important;
-            visibility: hidden !important;
-            width: 0 !important;
-            height: 0 !important;
-            font-size: 0 !important;
-        }
-        
-        /* Hide pseudo-elements that might contain icon text */
-        .streamlit-expanderHeader::after,
-        .streamlit-expanderHeader::before {
-            display: none !important;
-            content: "" !important;
-        }
-        
-        /* Hide any text containing icon names */
-        .streamlit-expanderHeader *:not([class*="expander"]):not([class*="title"]) {
-            font-family: "Baskerville", "Libre Baskerville", "Times New Roman", serif !important;
-        }
-        
-        /* Specifically target and hide "keyboard_arrow_right" text */
-        .streamlit-expanderHeader * {
-            text-indent: 0 !important;
-        }
-        
-        .streamlit-expanderContent {
-            background: #FDFCFB !important;
-            border: 1px solid rgba(139, 69, 19, 0.15) !important;
-            border-top: none !important;
-            padding: 1.5rem !important;
-            border-radius: 0 0 10px 10px !important;
-        }
-        
-        /* Expander content text */
-        .streamlit-expanderContent p,
-        .streamlit-expanderContent div {
-            color: #000000 !important;
-            font-size: 1.1rem !important;
-            line-height: 1.9 !important;
-        }
-        
-        /* Text styling - clear and readable */
-        .stMarkdown {
-            color: #000000 !important;
-            line-height: 1.9 !important;
-            font-size: 1.1rem !important;
-            font-weight: 400 !important;
-        }
-        
-        /* Message content spacing */
-        .stChatMessage p {
-            margin-bottom: 1.2rem;
-            line-height: 1.9;
-            color: #000000 !important;
-            font-size: 1.1rem !important;
-        }
-        
-        /* Lists in messages */
-        .stChatMessage ul,
-        .stChatMessage ol {
-            color: #000000 !important;
-            font-size: 1.1rem !important;
-            line-height: 1.9 !important;
-            margin: 1rem 0;
-        }
-        
-        .stChatMessage li {
-            margin-bottom: 0.75rem;
-            color: #000000 !important;
-        }
-        
-        /* Bold text in messages */
-        .stChatMessage strong,
-        .stChatMessage b {
-            color: #000000 !important;
-            font-weight: 700 !important;
-        }
-        
-        /* Divider */
-        hr {
-            border: none;
-            border-top: 2px solid rgba(139, 69, 19, 0.2);
-            margin: 2rem 0;
-        }
-        
-        /* Scrollbar - luxury gold */
-        ::-webkit-scrollbar {
-            width: 12px;
-        }
-        
-        ::-webkit-scrollbar-track {
-            background: rgba(245, 238, 220, 0.5);
-        }
-        
-        ::-webkit-scrollbar-thumb {
-            background: linear-gradient(180deg, #8B4513 0%, #CD853F 100%);
-            border-radius: 6px;
-            border: 2px solid rgba(245, 238, 220, 0.5);
-        }
-        
-        ::-webkit-scrollbar-thumb:hover {
-            background: linear-gradient(180deg, #A0522D 0%, #DEB887 100%);
-        }
-        
-        /* Alert boxes */
-        .stInfo {
-            background: rgba(245, 238, 220, 0.8) !important;
-            border-left: 4px solid #8B4513 !important;
-            color: #2C1810 !important;
-            border-radius: 8px;
-        }
-        
-        .stWarning {
-            background: rgba(255, 248, 230, 0.9) !important;
-            border-left: 4px solid #CD853F !important;
-            color: #2C1810 !important;
-            border-radius: 8px;
-        }
-        
-        /* User profile */
-        .user-profile {
-            background: rgba(139, 69, 19, 0.2);
-            padding: 1rem;
-            border-radius: 10px;
-            margin-top: 2rem;
-            border: 1px solid rgba(205, 133, 63, 0.3);
-        }
-        
-        .user-avatar {
-            background: linear-gradient(135deg, #8B4513 0%, #CD853F 100%) !important;
-            box-shadow: 0 2px 10px rgba(0, 0, 0, 0.3);
-        }
-        
-        /* Hide Streamlit branding */
-        #MainMenu {visibility: hidden;}
-        footer {visibility: hidden;}
-        header {visibility: hidden;}
-        
-        /* Spacing adjustment for chat history */
-        [data-testid="stVerticalBlock"] > [data-testid="stVerticalBlock"] {
-            gap: 0 !important;
-        }
-        </style>
-        <script>
-        // Remove icon text from expanders - runs after page loads
-        function removeIconText() {
-            var headers = document.querySelectorAll('.streamlit-expanderHeader');
-            headers.forEach(function(header) {
-                // Find and remove text nodes containing icon names
-                var walker = document.createTreeWalker(
-                    header,
-                    NodeFilter.SHOW_TEXT,
-                    null,
-                    false
-                );
-                var textNodes = [];
-                var node;
-                while (node = walker.nextNode()) {
-                    var text = node.textContent || '';
-                    if (text.includes('keyboard_arrow_right') || 
-                        (text.includes('arrow') && text.trim().length < 30 && text.trim().length > 0)) {
-                        textNodes.push(node);
-                    }
-                }
-                textNodes.forEach(function(textNode) {
-                    textNode.textContent = '';
-                });
-                
-                // Hide any icon elements
-                var iconElements = header.querySelectorAll('[class*="icon"], [class*="material"], svg, i, [data-icon]');
-                iconElements.forEach(function(el) {
-                    el.style.display = 'none';
-                    el.style.visibility = 'hidden';
-                    el.style.width = '0';
-                    el.style.height = '0';
-                });
-            });
-        }
-        
-        // Run on page load
-        if (document.readyState === 'loading') {
-            document.addEventListener('DOMContentLoaded', function() {
-                removeIconText();
-                setTimeout(removeIconText, 500);
-            });
-        } else {
-            removeIconText();
-            setTimeout(removeIconText, 500);
-        }
-        
-        // Watch for new expanders added by Streamlit
-        var observer = new MutationObserver(function(mutations) {
-            removeIconText();
-        });
-        observer.observe(document.body, { 
-            childList: true, 
-            subtree: true 
-        });
-        </script>
+        <div class="sidebar-brand">
+            <h2>CoTrial RAG</h2>
+            <p style="margin: 0.5rem 0 0 0; font-size: 0.9rem; color: rgba(245, 230, 211, 0.8); font-style: italic;">
+                Professional Research Assistant
+            </p>
+        </div>
         """,
         unsafe_allow_html=True,
     )
-
-    # Sidebar
-    with st.sidebar:
+    
+    if st.button("✨ New Conversation", use_container_width=True, type="primary"):
+        st.session_state.messages = []
+        st.session_state.history_window = HISTORY_WINDOW_SIZE
+        st.session_state.pop("_recent_cache_len", None)
+        st.rerun()
+    
+    st.markdown("<br>", unsafe_allow_html=True)
+    
+    if st.session_state.messages:
         st.markdown(
             """
-            <div class="sidebar-brand">
-                <h2>CoTrial RAG</h2>
-                <p style="margin: 0.5rem 0 0 0; font-size: 0.9rem; color: rgba(245, 230, 211, 0.8); font-style: italic;">
-                    Professional Research Assistant
-                </p>
+            <div style="margin-top: 2rem; padding-top: 1.5rem; border-top: 1px solid rgba(205, 133, 63, 0.3);">
+                <div style="color: #CD853F; font-size: 0.85rem; font-weight: 600; text-transform: uppercase; letter-spacing: 1px; margin-bottom: 1rem;">Recent Queries</div>
             </div>
             """,
             unsafe_allow_html=True,
         )
-        
-        if st.button("✨ New Conversation", use_container_width=True, type="primary"):
-            st.session_state.messages = []
-            st.rerun()
-        
-        st.markdown("<br>", unsafe_allow_html=True)
-        
-        if st.session_state.messages:
-            st.markdown(
-                """
-                <div style="margin-top: 2rem; padding-top: 1.5rem; border-top: 1px solid rgba(205, 133, 63, 0.3);">
-                    <div style="color: #CD853F; font-size: 0.85rem; font-weight: 600; text-transform: uppercase; letter-spacing: 1px; margin-bottom: 1rem;">Recent Queries</div>
-                </div>
-                """,
-                unsafe_allow_html=True,
-            )
-            recent_queries = [
-                msg["content"][:50] + "..." if len(msg["content"]) > 50 else msg["content"]
-                for msg in st.session_state.messages[-6:]
-                if msg["role"] == "user"
-            ]
-            for query in recent_queries[-3:]:
-                if st.button(query, key=f"recent_{query[:20]}", use_container_width=True):
-                    st.session_state.messages.append({"role": "user", "content": query})
-                    st.rerun()
-        
-        username = st.session_state.get("username", "User")
-        initial = username[0].upper() if username else "U"
-        
-        st.markdown(
-            f"""
-            <div class="user-profile">
-                <div style="display: flex; align-items: center; gap: 1rem;">
-                    <div class="user-avatar" style="width: 40px; height: 40px; border-radius: 50%; display: flex; align-items: center; justify-content: center; color: #F5E6D3; font-weight: 600; font-size: 1.1rem;">{initial}</div>
-                    <div style="flex: 1;">
-                        <p style="color: #F5E6D3; font-size: 1rem; font-weight: 600; margin: 0;">{username}</p>
-                        <p style="color: rgba(245, 230, 211, 0.7); font-size: 0.85rem; margin: 0; font-style: italic;">Professional Account</p>
-                    </div>
+        for i, query in enumerate(get_recent_queries()):
+            label = query[:50] + "..." if len(query) > 50 else query
+            if st.button(label, key=f"recent_{i}_{hash(query) & 0xffff}", use_container_width=True):
+                st.session_state.messages.append({"role": "user", "content": query})
+                _trim_history()
+                st.session_state.pending_prompt = query
+                st.rerun()
+    
+    username = st.session_state.get("username", "User")
+    initial = username[0].upper() if username else "U"
+    
+    st.markdown(
+        f"""
+        <div class="user-profile">
+            <div style="display: flex; align-items: center; gap: 1rem;">
+                <div class="user-avatar" style="width: 40px; height: 40px; border-radius: 50%; display: flex; align-items: center; justify-content: center; color: #F5E6D3; font-weight: 600; font-size: 1.1rem;">{initial}</div>
+                <div style="flex: 1;">
+                    <p style="color: #F5E6D3; font-size: 1rem; font-weight: 600; margin: 0;">{username}</p>
+                    <p style="color: rgba(245, 230, 211, 0.7); font-size: 0.85rem; margin: 0; font-style: italic;">Professional Account</p>
                 </div>
             </div>
-            """,
-            unsafe_allow_html=True,
-        )
-        
-        st.markdown("<br>", unsafe_allow_html=True)
-        
-        if st.button("🚪 Logout", use_container_width=True):
-            st.session_state.authenticated = False
-            st.switch_page("pages/login.py")
+        </div>
+        """,
+        unsafe_allow_html=True,
+    )
+    
+    st.markdown("<br>", unsafe_allow_html=True)
+    
+    if st.button("🚪 Logout", use_container_width=True):
+        log_out()
+
+
+def main() -> None:
+    """Main Streamlit app."""
+    sync_session()
+    if "authenticated" not in st.session_state or not st.session_state.authenticated:
+        st.switch_page("pages/login.py")
+    
+    initialize_session_state()
+    start_background_warm_up()
+
+    # Enhanced formal and rich styling
+    inject_css('chat.css')
+
+    # Sidebar
+    with st.sidebar:
+        _render_sidebar()
 
     # Main content - centered container
     with st.container():
         # Display chat history
         if st.session_state.messages:
-            for message in st.session_state.messages:
+            # Only render the most recent window; older messages load on demand
+            window = st.session_state.history_window
+            if len(st.session_state.messages) > window:
+                if st.button("⬆ Load earlier", key="load_earlier"):
+                    st.session_state.history_window += HISTORY_WINDOW_SIZE
+                    st.rerun()
+
+            for message in st.session_state.messages[-window:]:
                 role = message["role"]
                 content = message["content"]
                 citations = message.get("citations", [])
 
                 if role == "user":
                     with st.chat_message("user"):
-                        st.markdown(f'<div style="color: #000000; font-size: 1.1rem; line-height: 1.9;">{content}</div>', unsafe_allow_html=True)
+                        st.markdown(content)
                 else:
                     with st.chat_message("assistant"):
-                        st.markdown(f'<div style="color: #000000; font-size: 1.1rem; line-height: 1.9;">{content}</div>', unsafe_allow_html=True)
+                        st.markdown(content)
 
                         if citations:
-                            st.markdown(
-                                """
-                                <div style="margin-top: 2rem; padding-top: 2rem; border-top: 3px solid rgba(139, 69, 19, 0.3);">
-                                    <h4 style="color: #000000; font-size: 1.3rem; font-weight: 700; margin-bottom: 1.5rem; letter-spacing: 0.3px;">
-                                        Referenced Sources
-                                    </h4>
-                                </div>
-                                """,
-                                unsafe_allow_html=True,
-                            )
-                            for idx, citation in enumerate(citations):
-                                display_citation(citation, idx)
+                            _render_refs_header()
+                            display_citations(citations)
         else:
             # Show simple centered greeting when no messages
             st.markdown(
@@ -644,36 +440,49 @@ def main() -> None:
                 unsafe_allow_html=True,
             )
 
-    # Chat input
+    # Chat input: record the prompt and rerun so the history loop renders it once
     if prompt := st.chat_input("Type your question here..."):
         st.session_state.messages.append({"role": "user", "content": prompt})
+        _trim_history()
+        st.session_state.pending_prompt = prompt
+        st.rerun()
 
-        with st.chat_message("user"):
-            st.markdown(f'<div style="color: #000000; font-size: 1.1rem; line-height: 1.9;">{prompt}</div>', unsafe_allow_html=True)
-
+    if prompt := st.session_state.pop("pending_prompt", None):
         with st.chat_message("assistant"):
-            with st.spinner("Researching..."):
-                response = send_message(prompt)
-
-            if response:
-                answer = response.get("answer", "No answer provided.")
-                citations = response.get("citations", [])
+            # Stream the answer so it renders as it's generated
+            placeholder = st.empty()
+            answer: str | None = None
+            citations: list[dict[str, Any]] = []
+            try:
+                streamed_text = ""
+                for event in send_message_stream(prompt):
+                    event_type = event.get("type")
+                    if event_type == "token":
+                        streamed_text += event.get("text", "")
+                        placeholder.markdown(streamed_text)
+                    elif event_type == "citations":
+                        citations = event.get("citations", [])
+                    elif event_type == "error":
+                        st.warning(f"⚠️ {event.get('detail', 'Answer generation failed')}")
+                answer = streamed_text or None
+            except (requests.exceptions.RequestException, ValueError):
+                # Streaming endpoint unavailable (e.g. older API or a buffering gateway);
+                # use the regular endpoint, which has retry handling
+                answer = None
+                citations = []
 
-                st.markdown(f'<div style="color: #000000; font-size: 1.1rem; line-height: 1.9;">{answer}</div>', unsafe_allow_html=True)
+            if answer is None:
+                with st.spinner("Researching..."):
+                    response = send_message(prompt)
+                if response:
+                    answer = response.get("answer", "No answer provided.")
+                    citations = response.get("citations", [])
+                    placeholder.markdown(answer)
 
+            if answer is not None:
                 if citations:
-                    st.markdown(
-                        """
-                        <div style="margin-top: 2rem; padding-top: 2rem; border-top: 3px solid rgba(139, 69, 19, 0.3);">
-                            <h4 style="color: #000000; font-size: 1.3rem; font-weight: 700; margin-bottom: 1.5rem; letter-spacing: 0.3px;">
-                                Referenced Sources
-                            </h4>
-                        </div>
-                        """,
-                        unsafe_allow_html=True,
-                    )
-                    for idx, citation in enumerate(citations):
-                        display_citation(citation, idx)
+                    _render_refs_header()
+                    display_citations(citations)
 
                 st.session_state.messages.append(
                     {
@@ -682,6 +491,7 @@ def main() -> None:
                         "citations": citations,
                     }
                 )
+                _trim_history()
             else:
                 st.warning(
                     """
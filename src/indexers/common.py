@@ -1,8 +1,21 @@
 """Common utilities for indexing documents."""
 
+import os
 import re
+from functools import lru_cache
 from typing import List
 
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+CHUNKERS = ("paragraph", "tiktoken")
+
+# Paragraph (blank line) and sentence boundaries used by chunk_text
+_PARA_RE = re.compile(r'\n\s*\n')
+_SENT_RE = re.compile(r'(?<=[.!?])\s+')
+
 
 def chunk_text(text: str, max_tokens: int = 512, overlap: int = 64) -> List[str]:
     """
@@ -28,18 +41,18 @@ def chunk_text(text: str, max_tokens: int = 512, overlap: int = 64) -> List[str]
     max_chars = max_tokens * chars_per_token
     overlap_chars = overlap * chars_per_token
     
-    # Split by paragraphs first (double newlines)
-    paragraphs = re.split(r'\n\s*\n', text)
+    # Split by paragraphs first (double newlines), stripped with empties dropped
+    paragraphs = [p for p in map(str.strip, _PARA_RE.split(text)) if p]
+    
+    # Chunks shorter than this (after stripping) are dropped as artifacts
+    min_chunk_chars = 50
     
     chunks = []
+    prev_chunk = None  # last chunk produced, kept or not; source of the overlap
     current_chunk = []
     current_length = 0
     
     for para in paragraphs:
-        para = para.strip()
-        if not para:
-            continue
-            
         para_length = len(para)
         
         # If paragraph fits, add it
@@ -49,20 +62,17 @@ def chunk_text(text: str, max_tokens: int = 512, overlap: int = 64) -> List[str]
         else:
             # Current chunk is full, save it
             if current_chunk:
-                chunk_text = '\n\n'.join(current_chunk)
-                chunks.append(chunk_text)
+                prev_chunk = '\n\n'.join(current_chunk)
+                if len(prev_chunk.strip()) > min_chunk_chars:
+                    chunks.append(prev_chunk)
             
             # If paragraph itself is too long, split it by sentences
             if para_length > max_chars:
-                sentences = re.split(r'(?<=[.!?])\s+', para)
+                sentences = [s for s in map(str.strip, _SENT_RE.split(para)) if s]
                 current_chunk = []
                 current_length = 0
                 
                 for sentence in sentences:
-                    sentence = sentence.strip()
-                    if not sentence:
-                        continue
-                    
                     sent_length = len(sentence)
                     
                     if current_length + sent_length <= max_chars:
@@ -70,27 +80,27 @@ def chunk_text(text: str, max_tokens: int = 512, overlap: int = 64) -> List[str]
                         current_length += sent_length + 1
                     else:
                         if current_chunk:
-                            chunk_text = ' '.join(current_chunk)
-                            chunks.append(chunk_text)
+                            prev_chunk = ' '.join(current_chunk)
+                            if len(prev_chunk.strip()) > min_chunk_chars:
+                                chunks.append(prev_chunk)
                         
                         # Start new chunk with overlap
-                        if overlap_chars > 0 and chunks:
-                            # Take last part of previous chunk for overlap
-                            prev_chunk = chunks[-1]
-                            overlap_text = prev_chunk[-overlap_chars:] if len(prev_chunk) > overlap_chars else prev_chunk
-                            current_chunk = [overlap_text, sentence] if overlap_text else [sentence]
-                            current_length = len(' '.join(current_chunk))
+                        if overlap_chars > 0 and prev_chunk is not None:
+                            # Take last part of previous chunk for overlap (a slice
+                            # covering the whole chunk returns it without copying)
+                            overlap_text = prev_chunk[-overlap_chars:]
+                            current_chunk = [overlap_text, sentence]
+                            current_length = len(overlap_text) + 1 + sent_length
                         else:
                             current_chunk = [sentence]
                             current_length = sent_length
             else:
                 # Paragraph fits in new chunk, start fresh
                 # Add overlap from previous chunk if available
-                if overlap_chars > 0 and chunks:
-                    prev_chunk = chunks[-1]
-                    overlap_text = prev_chunk[-overlap_chars:] if len(prev_chunk) > overlap_chars else prev_chunk
-                    current_chunk = [overlap_text, para] if overlap_text else [para]
-                    current_length = len('\n\n'.join(current_chunk))
+                if overlap_chars > 0 and prev_chunk is not None:
+                    overlap_text = prev_chunk[-overlap_chars:]
+                    current_chunk = [overlap_text, para]
+                    current_length = len(overlap_text) + 2 + para_length
                 else:
                     current_chunk = [para]
                     current_length = para_length
@@ -98,10 +108,66 @@ def chunk_text(text: str, max_tokens: int = 512, overlap: int = 64) -> List[str]
     # Add final chunk
     if current_chunk:
         chunk_text = '\n\n'.join(current_chunk)
-        chunks.append(chunk_text)
-    
-    # Filter out very short chunks (likely artifacts)
-    chunks = [chunk for chunk in chunks if len(chunk.strip()) > 50]
+        if len(chunk_text.strip()) > min_chunk_chars:
+            chunks.append(chunk_text)
     
     return chunks
 
+
+@lru_cache(maxsize=4)
+def _get_encoding(encoding_name: str) -> "tiktoken.Encoding":
+    """Load a tiktoken encoding once per process."""
+    return tiktoken.get_encoding(encoding_name)
+
+
+def chunk_texts_batched(
+    texts: List[str],
+    max_tokens: int = 512,
+    overlap: int = 64,
+    encoding_name: str = "cl100k_base",
+) -> List[List[str]]:
+    """
+    Split many texts into exact token windows with overlap.
+    
+    All texts are encoded and decoded in single tiktoken batch calls, which
+    run multi-threaded in Rust. Windows are fixed-size and ignore paragraph
+    boundaries, unlike chunk_text.
+    
+    Args:
+        texts: Texts to chunk
+        max_tokens: Tokens per chunk
+        overlap: Tokens shared between consecutive chunks
+        encoding_name: tiktoken encoding (cl100k_base matches OpenAI embedding models)
+        
+    Returns:
+        One list of chunks per input text
+    """
+    if tiktoken is None:
+        raise ImportError("tiktoken not installed. Install with: pip install tiktoken")
+    if overlap >= max_tokens:
+        raise ValueError("overlap must be smaller than max_tokens")
+    
+    enc = _get_encoding(encoding_name)
+    num_threads = os.cpu_count() or 1
+    stride = max_tokens - overlap
+    
+    token_lists = enc.encode_batch(texts, num_threads=num_threads, disallowed_special=())
+    
+    windows: List[List[int]] = []
+    counts: List[int] = []
+    for tokens in token_lists:
+        starts = range(0, max(len(tokens) - overlap, 1), stride) if tokens else range(0)
+        counts.append(len(starts))
+        windows.extend(tokens[start : start + max_tokens] for start in starts)
+    
+    decoded = enc.decode_batch(windows, num_threads=num_threads)
+    
+    results: List[List[str]] = []
+    offset = 0
+    for count in counts:
+        chunks = decoded[offset : offset + count]
+        offset += count
+        # Filter out very short chunks (likely artifacts), as chunk_text does
+        results.append([chunk for chunk in chunks if len(chunk.strip()) > 50])
+    
+    return results
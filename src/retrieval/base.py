@@ -1,9 +1,9 @@
 """Base protocol for retrievers."""
 
-from typing import Protocol, runtime_checkable
+import asyncio
+from typing import Protocol
 
 
-@runtime_checkable
 class Retriever(Protocol):
     """Protocol for RAG retrievers."""
 
@@ -26,7 +26,34 @@ class Retriever(Protocol):
         """
         ...
 
+    async def asearch(self, query: str, top_k: int = 5) -> list[dict]:
+        """
+        Search without blocking the event loop.
+
+        Same arguments and results as search().
+        """
+        ...
+
     def close(self) -> None:
         """Clean up resources."""
         ...
 
+
+class AsyncSearchMixin:
+    """Default asearch() that runs a retriever's blocking search() in a worker thread."""
+
+    __slots__ = ()
+
+    async def asearch(self, query: str, top_k: int = 5) -> list[dict]:
+        """
+        Run search() in a worker thread so async callers keep serving requests.
+
+        Args:
+            query: Query text
+            top_k: Number of results per corpus
+
+        Returns:
+            Same results as search()
+        """
+        return await asyncio.to_thread(self.search, query, top_k)
+
@@ -0,0 +1,83 @@
+"""Process-wide retriever instances.
+
+Retrievers load models, indexes and database connections in load(), so callers
+that run repeatedly (Streamlit pages rerun top to bottom on every interaction,
+request handlers) should share one loaded instance per process instead of
+constructing and loading their own.
+"""
+
+import threading
+from collections.abc import Callable
+
+from src.retrieval.base import Retriever
+from src.utils.config import Config
+from src.utils.logging import get_logger, log_timing
+
+logger = get_logger(__name__)
+
+
+def _hybrid(config: Config | None) -> Retriever:
+    from src.retrieval.hybrid import HybridRetriever
+
+    return HybridRetriever(config)
+
+
+def _vector_db(config: Config | None) -> Retriever:
+    from src.retrieval.vector_db_retriever import VectorDBRetriever
+
+    return VectorDBRetriever(config)
+
+
+# Retriever name -> constructor (imports are deferred so unused backends stay unloaded)
+_REGISTRY: dict[str, Callable[[Config | None], Retriever]] = {
+    "hybrid": _hybrid,
+    "vector_db": _vector_db,
+}
+
+_instances: dict[str, Retriever] = {}
+_lock = threading.Lock()
+
+
+def get_retriever(name: str = "hybrid", config: Config | None = None) -> Retriever:
+    """
+    Get the loaded retriever registered under name, creating it on first use.
+
+    Construction and load() run once per process; concurrent first calls wait
+    for the same instance.
+
+    Args:
+        name: Registered retriever name ("hybrid" or "vector_db")
+        config: Config for the first construction (uses Config.from_env() if
+            None); ignored once the instance exists
+
+    Returns:
+        Loaded retriever instance
+
+    Raises:
+        KeyError: If no retriever is registered under name
+    """
+    retriever = _instances.get(name)
+    if retriever is not None:
+        return retriever
+
+    with _lock:
+        retriever = _instances.get(name)
+        if retriever is None:
+            if name not in _REGISTRY:
+                raise KeyError(f"Unknown retriever: {name} (available: {', '.join(_REGISTRY)})")
+            with log_timing("retriever_load", retriever=name):
+                retriever = _REGISTRY[name](config)
+                retriever.load()
+            _instances[name] = retriever
+    return retriever
+
+
+def close_retrievers() -> None:
+    """Close and forget all shared retriever instances."""
+    with _lock:
+        for name, retriever in _instances.items():
+            try:
+                retriever.close()
+            except Exception as e:
+                logger.warning("retriever_close_failed", retriever=name, error=str(e))
+        _instances.clear()
@@ -4,9 +4,15 @@ import concurrent.futures
 import os
 from typing import Any
 
+import numpy as np
+
+from src.retrieval.base import AsyncSearchMixin
+from src.retrieval.reranker import CrossEncoderReranker
+from src.retrieval.semantic_cache import SemanticCache
 from src.retrieval.vector_db_retriever import VectorDBRetriever
 from src.utils.agentic_router import AgenticRouter
 from src.utils.config import Config
+from src.utils.embeddings import embed_query
 from src.utils.logging import get_logger, log_timing
 from src.utils.mysql_client import MySQLClient
 from src.utils.prompt_examples import PromptExamples
@@ -14,8 +20,21 @@ from src.utils.sql_generator import SQLGenerator
 
 logger = get_logger(__name__)
 
+# Result column names that mark an aggregation query (COUNT, SUM, AVG, ...)
+_AGG_COLUMNS = frozenset({"count", "sum", "avg", "min", "max", "total", "average", "minimum", "maximum"})
+
+# Aggregations with at most this many rows are returned as one summary result
+_AGG_SUMMARY_MAX_ROWS = 10
+
+# Router decisions fall back to heuristics when the LLM fails, so they are kept
+# for less time than results
+DECISION_CACHE_TTL_SECONDS = 3600.0
 
-class HybridRetriever:
+# Worker threads for PDF and speculative SQL searches, shared by concurrent search() calls
+SEARCH_POOL_WORKERS = 8
+
+
+class HybridRetriever(AsyncSearchMixin):
     """
     Hybrid retriever that supports:
     - PDF: Vector search via Chroma vector database
@@ -23,6 +42,22 @@ class HybridRetriever:
     - Context: Pre-computed Q&A cache (prompt examples)
     """
 
+    __slots__ = (
+        "config",
+        "pdf_retriever",
+        "mysql_client",
+        "sql_generator",
+        "context_examples",
+        "router",
+        "_pool",
+        "_speculative_sql_wasted",
+        "_results_cache",
+        "_route_cache",
+        "_eval_cache",
+        "reranker",
+        "loaded",
+    )
+
     def __init__(self, config: Config | None = None):
         """
         Initialize hybrid retriever.
@@ -45,6 +80,19 @@ class HybridRetriever:
         # Agentic reasoning layer for query routing
         self.router = AgenticRouter(self.config)
         
+        # Local cross-encoder used instead of LLM result evaluation (loaded in load())
+        self.reranker: CrossEncoderReranker | None = None
+        
+        # Runs PDF searches and speculative SQL alongside the context check (created in load())
+        self._pool: concurrent.futures.ThreadPoolExecutor | None = None
+        # Semantic caches for final results (tagged with top_k) and the router's LLM decisions
+        self._results_cache = SemanticCache()
+        self._route_cache = SemanticCache(ttl=DECISION_CACHE_TTL_SECONDS)
+        self._eval_cache = SemanticCache(ttl=DECISION_CACHE_TTL_SECONDS)
+        
+        # Speculative SQL runs whose results were discarded after a context cache hit
+        self._speculative_sql_wasted = 0
+        
         self.loaded = False
 
     def load(self) -> None:
@@ -52,6 +100,11 @@ class HybridRetriever:
         Load/initialize the retrievers.
         Vector DB loads automatically, no manifest needed.
         """
+        if self._pool is None:
+            self._pool = concurrent.futures.ThreadPoolExecutor(
+                max_workers=SEARCH_POOL_WORKERS, thread_name_prefix="hybrid-search"
+            )
+
         # Initialize vector DB retriever for PDFs
         try:
             self.pdf_retriever = VectorDBRetriever(self.config)
@@ -78,12 +131,29 @@ class HybridRetriever:
         except Exception as e:
             logger.warning("context_examples_load_failed", error=str(e))
 
+        # Embed context example questions once for semantic cache lookups
+        if self.context_examples.count() > 0:
+            try:
+                with log_timing("context_examples_embedded", count=self.context_examples.count()):
+                    self.context_examples.embed_questions(self.config)
+            except Exception as e:
+                logger.warning("context_examples_embed_failed", error=str(e))
+
+        # Cross-encoder reranker replaces the LLM result evaluation when configured
+        if not self.config.use_llm_evaluator and self.config.reranker_model_path and self.reranker is None:
+            try:
+                with log_timing("reranker_load"):
+                    self.reranker = CrossEncoderReranker(self.config.reranker_model_path)
+            except Exception as e:
+                logger.warning("reranker_init_failed", error=str(e), fallback="llm_evaluator")
+
         self.loaded = True
         logger.info(
             "hybrid_retriever_loaded",
             pdf_loaded=self.pdf_retriever.loaded if self.pdf_retriever else False,
             mysql_available=self.mysql_client is not None,
             context_examples_count=self.context_examples.count(),
+            reranker=self.reranker is not None,
         )
 
     def search(self, query: str, top_k: int = 5) -> list[dict[str, Any]]:
@@ -106,8 +176,17 @@ class HybridRetriever:
         if not self.loaded:
             raise RuntimeError("Retriever not loaded. Call load() first.")
 
+        # Embedded once per search: near-duplicate questions reuse earlier results, and
+        # the same vector serves the context cache and the PDF (Chroma) query
+        query_embedding = self._embed_query(query)
+        if query_embedding is not None:
+            cached = self._results_cache.get(query_embedding, tag=top_k)
+            if cached is not None:
+                logger.info("semantic_cache_hit", query_preview=query[:50], final_count=len(cached))
+                return list(cached)
+
         # Step 1: Use agentic reasoning to route query (without context check first)
-        route = self.router.route_query(query, context_examples=None)
+        route = self._route(query, query_embedding)
         logger.debug("query_routed_agentic", query=query[:50], route=route)
 
         # Step 2: Determine which sources to search
@@ -118,27 +197,45 @@ class HybridRetriever:
         sas_results: list[dict[str, Any]] = []
         context_results: list[dict[str, Any]] = []
 
-        # Step 3: For SQL queries, check context cache FIRST before generating SQL
+        # Step 3: Start the PDF search (no context check for PDF) on the pool so it
+        # overlaps the context cache lookup and SQL generation below
+        pdf_future = None
+        if search_pdf and self.pdf_retriever and self.pdf_retriever.loaded:
+            pdf_future = self._pool.submit(
+                self.pdf_retriever.search, query, top_k, query_embedding=query_embedding
+            )
+
+        # For SQL queries, speculatively start SQL generation alongside the
+        # context cache check; it is discarded if the cache has a good match
+        sql_future = None
+        if search_sas and self.mysql_client and self.config.speculative_sql:
+            sql_future = self._pool.submit(self._search_sas_sql, query, top_k)
+
+        # For SQL queries, check context cache FIRST before using SQL results
         if search_sas:
-            context_results = self._search_context(query, top_k=3)
+            context_results = self._search_context(query, top_k=3, query_embedding=query_embedding)
             
-            # Check if context has a good match (similarity > 0.5)
+            # Check if context has a good match (cosine similarity at or above
+            # CONTEXT_MATCH_THRESHOLD, i.e. effectively the same question)
             has_good_context_match = (
                 context_results and 
                 len(context_results) > 0 and 
-                context_results[0].get("score", 0.0) > 0.5
+                context_results[0].get("score", 0.0) >= self.config.context_match_threshold
             )
             
             if has_good_context_match:
+                # Use context cache, drop the speculative SQL (it keeps running if already started)
+                if sql_future is not None and not sql_future.cancel():
+                    self._speculative_sql_wasted += 1
                 logger.info(
                     "context_cache_hit",
                     query_preview=query[:50],
                     context_score=context_results[0].get("score", 0.0),
+                    speculative_sql_wasted=self._speculative_sql_wasted,
                 )
-                # Use context cache, skip SQL generation
-                sas_results = []  # Don't generate SQL if context has good match
+                sas_results = []  # Don't use SQL if context has good match
             else:
-                # No good context match, proceed with SQL generation
+                # No good context match, use (or run) SQL generation
                 logger.info(
                     "context_cache_miss",
                     query_preview=query[:50],
@@ -146,39 +243,41 @@ class HybridRetriever:
                 )
                 if self.mysql_client:
                     try:
-                        sas_results = self._search_sas_sql(query, top_k)
+                        if sql_future is not None:
+                            sas_results = sql_future.result()
+                        else:
+                            sas_results = self._search_sas_sql(query, top_k)
                     except Exception as e:
                         logger.error("sas_sql_search_failed", error=str(e), query=query[:50])
                         sas_results = []
-        else:
-            # Not a SQL query, no context check needed
-            context_results = []
 
-        # Step 4: Search PDF if needed (no context check for PDF)
-        if search_pdf and self.pdf_retriever and self.pdf_retriever.loaded:
+        # Step 4: Collect the PDF results
+        if pdf_future is not None:
             try:
-                pdf_results = self.pdf_retriever.search(query, top_k)
+                pdf_results = pdf_future.result()
             except Exception as e:
                 logger.error("pdf_search_failed", error=str(e), query=query[:50])
                 pdf_results = []
 
-        # Step 5: Evaluate result quality using LLM
-        evaluation = self.router.evaluate_result_quality(
-            query=query,
-            pdf_results=pdf_results,
-            sas_results=sas_results,
-            context_results=context_results if context_results else None,
-        )
-
-        # Step 6: Intelligently combine results based on evaluation
-        combined_results = self._combine_results_intelligently(
-            query=query,
-            pdf_results=pdf_results,
-            sas_results=sas_results,
-            context_results=context_results if context_results else None,
-            evaluation=evaluation,
-            top_k=top_k,
-        )
+        # Step 5: Rank the candidates with the cross-encoder when configured, otherwise
+        # evaluate result quality using LLM and combine based on the evaluation
+        combined_results = None
+        recommendation = "rerank"
+        if self.reranker is not None:
+            combined_results = self._rerank(query, pdf_results + sas_results + context_results, top_k)
+        if combined_results is None:
+            evaluation = self._evaluate(query, query_embedding, pdf_results, sas_results, context_results)
+            recommendation = evaluation.get("recommendation", "use_both")
+
+            # Step 6: Intelligently combine results based on evaluation
+            combined_results = self._combine_results_intelligently(
+                query=query,
+                pdf_results=pdf_results,
+                sas_results=sas_results,
+                context_results=context_results if context_results else None,
+                evaluation=evaluation,
+                top_k=top_k,
+            )
 
         logger.info(
             "hybrid_search_complete",
@@ -187,12 +286,98 @@ class HybridRetriever:
             pdf_count=len(pdf_results),
             sas_count=len(sas_results),
             context_count=len(context_results),
-            recommendation=evaluation.get("recommendation", "use_both"),
+            recommendation=recommendation,
             final_count=len(combined_results),
         )
 
+        # Empty results may come from a failing backend, so only real answers are cached
+        if query_embedding is not None and combined_results:
+            self._results_cache.put(query_embedding, list(combined_results), tag=top_k)
+
         return combined_results
 
+    def _rerank(
+        self, query: str, candidates: list[dict[str, Any]], top_k: int
+    ) -> list[dict[str, Any]] | None:
+        """
+        Order PDF, SAS and context candidates by cross-encoder relevance.
+
+        Each returned result's score is replaced by its relevance probability.
+
+        Returns:
+            Up to top_k * 2 results, best first, or None if scoring failed
+        """
+        if not candidates:
+            return []
+        
+        try:
+            with log_timing("rerank", candidates=len(candidates)):
+                scores = self.reranker.score(query, [r.get("text", "") for r in candidates])
+        except Exception as e:
+            logger.error("rerank_failed", error=str(e), query=query[:50])
+            return None
+        
+        reranked = []
+        for i in np.argsort(-scores, kind="stable")[: top_k * 2].tolist():
+            result = candidates[i]
+            result["score"] = float(scores[i])
+            reranked.append(result)
+        return reranked
+
+    def _route(self, query: str, query_embedding: np.ndarray | None) -> str:
+        """Route the query, reusing the decision made for a near-duplicate query."""
+        if query_embedding is None:
+            return self.router.route_query(query, context_examples=None)
+        
+        route = self._route_cache.get(query_embedding)
+        if route is None:
+            route = self.router.route_query(query, context_examples=None)
+            self._route_cache.put(query_embedding, route)
+        return route
+
+    def _evaluate(
+        self,
+        query: str,
+        query_embedding: np.ndarray | None,
+        pdf_results: list[dict[str, Any]],
+        sas_results: list[dict[str, Any]],
+        context_results: list[dict[str, Any]],
+    ) -> dict[str, Any]:
+        """
+        Evaluate result quality, reusing the evaluation of a near-duplicate
+        query that retrieved the same top results.
+        
+        Not cached when any top result scores below 0.1: such weak matches
+        are where the LLM's judgement is least predictable from the ids alone.
+        """
+        top = pdf_results[:3] + sas_results[:3] + context_results[:3]
+        cacheable = query_embedding is not None and all(r.get("score", 0.0) >= 0.1 for r in top)
+        # SQL chunk ids are positional, so the text is part of the fingerprint
+        fingerprint = tuple((r.get("chunk_id"), hash(r.get("text", ""))) for r in top)
+        
+        if cacheable:
+            evaluation = self._eval_cache.get(query_embedding, tag=fingerprint)
+            if evaluation is not None:
+                return evaluation
+        
+        evaluation = self.router.evaluate_result_quality(
+            query=query,
+            pdf_results=pdf_results,
+            sas_results=sas_results,
+            context_results=context_results if context_results else None,
+        )
+        if cacheable:
+            self._eval_cache.put(query_embedding, evaluation, tag=fingerprint)
+        return evaluation
+
+    def _embed_query(self, query: str) -> np.ndarray | None:
+        """Embed the query once per search, or None if embeddings are unavailable."""
+        try:
+            return embed_query(query, self.config)
+        except Exception as e:
+            logger.warning("query_embedding_failed", error=str(e), query=query[:50])
+            return None
+
     def _search_sas_sql(self, query: str, top_k: int = 5) -> list[dict[str, Any]]:
         """
         Search SAS data using SQL queries.
@@ -211,21 +396,19 @@ class HybridRetriever:
             # Generate SQL from natural language
             sql = self.sql_generator.generate_sql(query, limit=top_k)
 
-            # Execute query
-            rows = self.mysql_client.execute_query_with_limit(sql, limit=top_k)
+            # Execute query, reading only as many rows as can be used: top_k for
+            # row results, one past the summary cap to recognise small aggregations
+            rows = list(self.mysql_client.iter_query(sql, limit=max(top_k, _AGG_SUMMARY_MAX_ROWS + 1)))
 
             # Convert SQL results to same format as vector search results
             results = []
             
-            # Check if this is an aggregation query (has COUNT, SUM, AVG, etc.)
-            is_aggregation = any(
-                col.lower() in ["count", "sum", "avg", "min", "max", "total", "average", "minimum", "maximum"]
-                for row in rows
-                for col in row.keys()
-            ) if rows else False
+            # Check if this is an aggregation query (has COUNT, SUM, AVG, etc.);
+            # dict cursor rows all share the first row's columns
+            is_aggregation = bool(rows) and any(col.lower() in _AGG_COLUMNS for col in rows[0])
             
             # Format results differently for aggregations vs regular queries
-            if is_aggregation and len(rows) <= 10:
+            if is_aggregation and len(rows) <= _AGG_SUMMARY_MAX_ROWS:
                 # For aggregations, create a summary text
                 summary_parts = []
                 for row in rows:
@@ -255,7 +438,7 @@ class HybridRetriever:
                     results.append(result)
             else:
                 # Regular query results - format each row
-                for idx, row in enumerate(rows):
+                for idx, row in enumerate(rows[:top_k]):
                     # Convert row to text representation
                     text_parts = [f"{k}: {v}" for k, v in row.items() if v is not None]
                     text = " | ".join(text_parts)
@@ -276,57 +459,34 @@ class HybridRetriever:
             logger.error("sas_sql_search_failed", query=query[:50], error=str(e))
             return []
 
-    def _search_context(self, query: str, top_k: int = 3) -> list[dict[str, Any]]:
+    def _search_context(
+        self, query: str, top_k: int = 3, query_embedding: np.ndarray | None = None
+    ) -> list[dict[str, Any]]:
         """
         Search context cache (pre-computed Q&A examples).
         
-        Uses improved similarity scoring to better match queries.
+        Scores examples by cosine similarity between the query embedding and
+        the example question embeddings computed at load time.
         
         Args:
             query: User query
             top_k: Maximum number of context examples to return
+            query_embedding: Precomputed query embedding (embedded here if None)
             
         Returns:
             List of context results in same format as other retrievers
         """
+        if not self.context_examples.embedded:
+            return []
+        
         try:
-            examples = self.context_examples.get_examples(max_examples=top_k * 2, query=query)  # Get more for better scoring
-            
-            results = []
-            query_lower = query.lower()
-            query_words = set(query_lower.split())
-            
-            for idx, ex in enumerate(examples):
-                question = ex.get("question", "").lower()
-                question_words = set(question.split())
-                
-                # Improved similarity scoring
-                # 1. Exact word matches
-                exact_matches = query_words & question_words
-                
-                # 2. Partial word matches (substring)
-                partial_matches = sum(
-                    1 for qw in query_words
-                    for qw2 in question_words
-                    if qw in qw2 or qw2 in qw
-                )
-                
-                # 3. Calculate Jaccard similarity
-                union = query_words | question_words
-                intersection = query_words & question_words
-                jaccard = len(intersection) / len(union) if union else 0.0
-                
-                # 4. Weighted score: Jaccard (70%) + exact matches (20%) + partial (10%)
-                similarity = (
-                    jaccard * 0.7 +
-                    (len(exact_matches) / max(len(query_words), 1)) * 0.2 +
-                    min(partial_matches / max(len(query_words), 1), 1.0) * 0.1
-                )
-                
-                result = {
+            if query_embedding is None:
+                query_embedding = embed_query(query, self.config)
+            return [
+                {
                     "corpus": "context",
                     "chunk_id": f"context_{idx}",
-                    "score": min(similarity, 1.0),
+                    "score": max(0.0, min(similarity, 1.0)),
                     "text": ex.get("answer", ""),
                     "metadata": {
                         "question": ex.get("question", ""),
@@ -334,13 +494,8 @@ class HybridRetriever:
                         "query_type": "cached_answer",
                     },
                 }
-                results.append(result)
-            
-            # Sort by similarity score
-            results.sort(key=lambda x: x.get("score", 0.0), reverse=True)
-            
-            # Return top_k with best scores
-            return results[:top_k]
+                for idx, similarity, ex in self.context_examples.similar_examples(query_embedding, top_k)
+            ]
             
         except Exception as e:
             logger.error("context_search_failed", error=str(e), query=query[:50])
@@ -419,5 +574,8 @@ class HybridRetriever:
         if self.pdf_retriever:
             self.pdf_retriever.close()
         # MySQL connections are managed via context managers, no explicit close needed
+        if self._pool is not None:
+            self._pool.shutdown(wait=False)
+            self._pool = None
         self.loaded = False
 
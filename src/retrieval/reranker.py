@@ -0,0 +1,84 @@
+"""Cross-encoder reranking of retrieval candidates with a local ONNX model."""
+
+from pathlib import Path
+
+import numpy as np
+
+try:
+    import onnxruntime as ort
+except ImportError:
+    ort = None
+
+try:
+    from tokenizers import Tokenizer
+except ImportError:
+    Tokenizer = None
+
+from src.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+class CrossEncoderReranker:
+    """
+    Scores (query, passage) pairs with an exported cross-encoder such as
+    bge-reranker-v2-m3.
+
+    The model directory must contain model.onnx and tokenizer.json (the
+    layout produced by exporting the Hugging Face model to ONNX).
+    """
+
+    __slots__ = ("session", "tokenizer", "batch_size", "_input_names")
+
+    def __init__(self, model_dir: Path | str, max_length: int = 512, batch_size: int = 16):
+        """
+        Load the reranker model.
+
+        Args:
+            model_dir: Directory with model.onnx and tokenizer.json
+            max_length: Maximum tokens per (query, passage) pair
+            batch_size: Pairs scored per inference call
+        """
+        if ort is None or Tokenizer is None:
+            raise ImportError(
+                "onnxruntime and tokenizers not installed. Install with: pip install onnxruntime tokenizers"
+            )
+
+        model_dir = Path(model_dir)
+        self.session = ort.InferenceSession(
+            str(model_dir / "model.onnx"), providers=["CPUExecutionProvider"]
+        )
+        self.tokenizer = Tokenizer.from_file(str(model_dir / "tokenizer.json"))
+        self.tokenizer.enable_truncation(max_length=max_length)
+        self.tokenizer.enable_padding()  # pad each batch to its longest pair
+        self.batch_size = batch_size
+        self._input_names = {i.name for i in self.session.get_inputs()}
+        logger.info("reranker_loaded", model_dir=str(model_dir))
+
+    def score(self, query: str, texts: list[str]) -> np.ndarray:
+        """
+        Score how relevant each text is to the query.
+
+        Args:
+            query: Query text
+            texts: Candidate passages
+
+        Returns:
+            Relevance probabilities (sigmoid of the model logits), one per text
+        """
+        scores = np.empty(len(texts), dtype=np.float32)
+        for start in range(0, len(texts), self.batch_size):
+            batch = texts[start : start + self.batch_size]
+            encodings = self.tokenizer.encode_batch([(query, text) for text in batch])
+
+            feeds = {
+                "input_ids": np.array([e.ids for e in encodings], dtype=np.int64),
+                "attention_mask": np.array([e.attention_mask for e in encodings], dtype=np.int64),
+            }
+            # BERT-style models take segment ids; XLM-R based ones (bge-m3) do not
+            if "token_type_ids" in self._input_names:
+                feeds["token_type_ids"] = np.array([e.type_ids for e in encodings], dtype=np.int64)
+
+            logits = self.session.run(None, feeds)[0].reshape(len(batch), -1)[:, 0]
+            scores[start : start + len(batch)] = 1.0 / (1.0 + np.exp(-logits))
+        return scores
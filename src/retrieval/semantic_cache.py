@@ -0,0 +1,150 @@
+"""Semantic cache keyed on query embeddings.
+
+Near-duplicate questions ("how many grade 3 AEs?" / "number of grade 3 adverse
+events") embed to nearly the same vector, so their results and routing
+decisions can be reused. Keys are bucketed with random-projection LSH: each of
+n_tables tables hashes the query to the sign pattern of `bits` random
+hyperplanes, so a lookup only compares against the few entries sharing a
+bucket instead of every entry.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Hashable
+from typing import Any
+
+import numpy as np
+
+
+class _Entry:
+    """One cached value and the bucket keys it is filed under."""
+
+    __slots__ = ("embedding", "tag", "value", "expires_at", "keys")
+
+    def __init__(self, embedding: np.ndarray, tag: Hashable, value: Any, expires_at: float, keys: list[int]):
+        self.embedding = embedding
+        self.tag = tag
+        self.value = value
+        self.expires_at = expires_at
+        self.keys = keys
+
+
+class SemanticCache:
+    """Thread-safe LSH-bucketed cache of values for similar query embeddings."""
+
+    def __init__(
+        self,
+        dim: int | None = None,
+        n_tables: int = 8,
+        bits: int = 12,
+        threshold: float = 0.95,
+        ttl: float = 7 * 86400,
+        max_entries: int = 10000,
+        seed: int = 0,
+    ):
+        """
+        Initialize semantic cache.
+
+        Args:
+            dim: Embedding dimension (inferred from the first embedding if None)
+            n_tables: Number of LSH hash tables
+            bits: Hyperplanes (hash bits) per table
+            threshold: Minimum cosine similarity for a cache hit
+            ttl: Seconds an entry stays valid
+            max_entries: Entries kept before the oldest is evicted
+            seed: Seed for the random hyperplanes
+        """
+        self.n_tables = n_tables
+        self.bits = bits
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._seed = seed
+        self._planes: np.ndarray | None = None
+        # Packs each table's sign bits into one integer bucket key
+        self._bit_weights = np.left_shift(np.uint64(1), np.arange(bits, dtype=np.uint64))
+        self._tables: list[dict[int, list[_Entry]]] = [{} for _ in range(n_tables)]
+        self._entries: OrderedDict[int, _Entry] = OrderedDict()  # id(entry) -> entry, oldest first
+        self._lock = threading.Lock()
+        if dim is not None:
+            self._init_planes(dim)
+
+    def _init_planes(self, dim: int) -> None:
+        rng = np.random.default_rng(self._seed)
+        self._planes = rng.standard_normal((self.n_tables * self.bits, dim)).astype(np.float32)
+
+    def _bucket_keys(self, embedding: np.ndarray) -> list[int]:
+        """Return the bucket key of embedding in each table."""
+        if self._planes is None:
+            self._init_planes(embedding.shape[0])
+        signs = (self._planes @ embedding > 0).reshape(self.n_tables, self.bits)
+        return (signs.astype(np.uint64) @ self._bit_weights).tolist()
+
+    def _remove(self, entry: _Entry) -> None:
+        """Drop entry from the entry list and every bucket it is filed under."""
+        self._entries.pop(id(entry), None)
+        for table, key in zip(self._tables, entry.keys):
+            bucket = table.get(key)
+            if bucket is None:
+                continue
+            try:
+                bucket.remove(entry)
+            except ValueError:
+                continue
+            if not bucket:
+                del table[key]
+
+    def get(self, embedding: np.ndarray, tag: Hashable = None) -> Any | None:
+        """
+        Look up the value cached for a similar query.
+
+        Args:
+            embedding: L2-normalized query embedding
+            tag: Extra key that must match exactly (e.g. top_k or a result fingerprint)
+
+        Returns:
+            Value of the most similar live entry at or above the threshold,
+            or None on a miss
+        """
+        now = time.monotonic()
+        with self._lock:
+            best: _Entry | None = None
+            best_score = self.threshold
+            seen: set[int] = set()
+            for table, key in zip(self._tables, self._bucket_keys(embedding)):
+                for entry in list(table.get(key, ())):
+                    if id(entry) in seen:
+                        continue
+                    seen.add(id(entry))
+                    if entry.expires_at <= now:
+                        self._remove(entry)
+                        continue
+                    if entry.tag != tag:
+                        continue
+                    score = float(entry.embedding @ embedding)
+                    if score >= best_score:
+                        best, best_score = entry, score
+            return best.value if best is not None else None
+
+    def put(self, embedding: np.ndarray, value: Any, tag: Hashable = None) -> None:
+        """
+        Cache a value for a query embedding.
+
+        Args:
+            embedding: L2-normalized query embedding
+            value: Value to return for similar queries (not copied)
+            tag: Extra key that must match exactly on lookup
+        """
+        with self._lock:
+            keys = self._bucket_keys(embedding)
+            entry = _Entry(embedding, tag, value, time.monotonic() + self.ttl, keys)
+            for table, key in zip(self._tables, keys):
+                table.setdefault(key, []).append(entry)
+            self._entries[id(entry)] = entry
+            while len(self._entries) > self.max_entries:
+                _, oldest = next(iter(self._entries.items()))
+                self._remove(oldest)
+
+    def __len__(self) -> int:
+        return len(self._entries)
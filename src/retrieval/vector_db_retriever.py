@@ -2,25 +2,54 @@
 
 from typing import Any
 
+import numpy as np
+
+from src.retrieval.base import AsyncSearchMixin
 from src.utils.config import Config
 from src.utils.logging import get_logger, log_timing
 from src.utils.vector_db import VectorDBClient
 
 logger = get_logger(__name__)
 
+# Reciprocal rank fusion constant: a chunk at rank r in one ranking adds 1 / (RRF_K + r)
+RRF_K = 60
+
+
+def _rrf_fuse(rankings: list[list[dict[str, Any]]], top_k: int) -> list[dict[str, Any]]:
+    """
+    Fuse several ranked result lists with reciprocal rank fusion.
+
+    Chunks found by several queries are merged, keeping the copy with the
+    best similarity score.
+    """
+    best: dict[str, dict[str, Any]] = {}
+    fused: dict[str, float] = {}
+    for results in rankings:
+        for rank, result in enumerate(results, 1):
+            chunk_id = result["chunk_id"]
+            fused[chunk_id] = fused.get(chunk_id, 0.0) + 1.0 / (RRF_K + rank)
+            kept = best.get(chunk_id)
+            if kept is None or result["score"] > kept["score"]:
+                best[chunk_id] = result
+    top = sorted(fused, key=fused.__getitem__, reverse=True)[:top_k]
+    return [{**best[chunk_id], "rrf_score": fused[chunk_id]} for chunk_id in top]
 
-class VectorDBRetriever:
+
+class VectorDBRetriever(AsyncSearchMixin):
     """Retriever that uses Chroma vector database for PDF documents."""
 
-    def __init__(self, config: Config | None = None):
+    __slots__ = ("config", "vector_db", "loaded", "corpus_counts")
+
+    def __init__(self, config: Config | None = None, vector_db: VectorDBClient | None = None):
         """
         Initialize vector DB retriever.
 
         Args:
             config: Config instance (uses Config.from_env() if None)
+            vector_db: Existing client to share (and its resolved collection)
         """
         self.config = config or Config.from_env()
-        self.vector_db = VectorDBClient(self.config)
+        self.vector_db = vector_db or VectorDBClient(self.config)
         self.loaded = False
         self.corpus_counts: dict[str, int] = {}
 
@@ -36,13 +65,29 @@ class VectorDBRetriever:
             logger.error("vector_db_load_failed", error=str(e))
             raise
 
-    def search(self, query: str, top_k: int = 5) -> list[dict[str, Any]]:
+    def search(
+        self,
+        query: str,
+        top_k: int = 5,
+        query_variants: list[str] | None = None,
+        query_embedding: np.ndarray | None = None,
+    ) -> list[dict[str, Any]]:
         """
         Search for similar documents using simple cosine similarity.
 
+        With query_variants (e.g. rephrasings of the query), all queries go to
+        Chroma in one batch and their rankings are fused with reciprocal rank
+        fusion; 'score' stays the best similarity a chunk reached, and the
+        fused value is added as 'rrf_score'.
+
         Args:
             query: Query text
             top_k: Number of results to return
+            query_variants: Optional alternative phrasings searched alongside query
+            query_embedding: Precomputed query embedding (config.embed_model),
+                reused instead of having Chroma embed the query again; ignored
+                with query_variants or offline embeddings, which don't match
+                the collection's vectors
 
         Returns:
             List of results with 'text', 'metadata', 'score', 'corpus', 'chunk_id'
@@ -50,33 +95,61 @@ class VectorDBRetriever:
         if not self.loaded:
             self.load()
 
-        # Check if collection has documents
-        collection = self.vector_db.get_or_create_collection()
-        if collection.count() == 0:
-            logger.warning("vector_db_empty", query_preview=query[:50])
-            return []
+        # Check if collection has documents. A nonzero count from load() skips
+        # the count round-trip; an empty snapshot is re-checked on the cached
+        # collection handle, since documents may have been indexed since load()
+        if self.corpus_counts.get("pdf", 0) == 0:
+            try:
+                self.corpus_counts["pdf"] = self.vector_db.get_or_create_collection().count()
+            except Exception as e:
+                logger.error("vector_db_count_error", error=str(e))
+                return []
+            if self.corpus_counts["pdf"] == 0:
+                logger.warning("vector_db_empty", query_preview=query[:50])
+                return []
+
+        queries = [query]
+        if query_variants:
+            queries.extend(dict.fromkeys(v for v in query_variants if v and v != query))
 
-        with log_timing("vector_db_search"):
+        with log_timing("vector_db_search", queries=len(queries)):
             try:
-                results = self.vector_db.search(query, n_results=top_k)
+                embeddings = None
+                if query_embedding is not None and len(queries) == 1 and not self.config.embed_offline:
+                    embeddings = [query_embedding]
+                batches = self.vector_db.search_many(
+                    queries, n_results=top_k, query_embeddings=embeddings
+                )
             except Exception as e:
                 logger.error("vector_db_search_error", error=str(e), query_preview=query[:50])
                 return []
 
+        ranked = [self._format_results(results) for results in batches]
+        formatted_results = ranked[0] if len(ranked) == 1 else _rrf_fuse(ranked, top_k)
+
         # Check if we got any results
-        if not results["ids"] or len(results["ids"]) == 0:
+        if not formatted_results:
             logger.warning("vector_db_no_results", query_preview=query[:50])
             return []
 
-        # Convert to standard format
+        logger.info(
+            "vector_db_search_complete",
+            query_preview=query[:50],
+            queries=len(queries),
+            results=len(formatted_results),
+            top_score=formatted_results[0]["score"],
+        )
+        return formatted_results
+
+    @staticmethod
+    def _format_results(results: dict[str, Any]) -> list[dict[str, Any]]:
+        """Convert one query's Chroma results to the standard result format."""
         formatted_results = []
-        for i, (doc_id, doc_text, metadata, distance) in enumerate(
-            zip(
-                results["ids"],
-                results["documents"],
-                results["metadatas"],
-                results["distances"],
-            )
+        for doc_id, doc_text, metadata, distance in zip(
+            results["ids"],
+            results["documents"],
+            results["metadatas"],
+            results["distances"],
         ):
             # ChromaDB uses cosine distance (0 = identical, 2 = opposite)
             # Convert to similarity score (higher is better)
@@ -95,13 +168,6 @@ class VectorDBRetriever:
                 "corpus": "pdf",
                 "chunk_id": doc_id,
             })
-
-        logger.info(
-            "vector_db_search_complete",
-            query_preview=query[:50],
-            results=len(formatted_results),
-            top_score=formatted_results[0]["score"] if formatted_results else 0.0,
-        )
         return formatted_results
 
     def close(self) -> None:
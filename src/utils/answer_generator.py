@@ -1,6 +1,7 @@
 """Answer generation using GPT from retrieved context."""
 
 import os
+from collections.abc import Iterator
 from typing import Any
 
 try:
@@ -46,15 +47,14 @@ class AnswerGenerator:
             logger.warning("prompt_examples_load_failed", error=str(e))
             self.prompt_examples = None
 
-    @log_timing("generate_answer")
-    def generate(
+    def _build_messages(
         self,
         query: str,
         context_chunks: list[dict[str, Any]],
-        max_context_tokens: int = 3000,
-    ) -> str:
+        max_context_tokens: int,
+    ) -> tuple[list[dict[str, str]] | None, str | None, int]:
         """
-        Generate answer from query and context chunks using GPT.
+        Build the chat messages for a query and its retrieved context.
 
         Args:
             query: User query
@@ -62,10 +62,11 @@ class AnswerGenerator:
             max_context_tokens: Maximum tokens to use for context (rough estimate)
 
         Returns:
-            Generated answer string
+            Tuple of (messages, early_answer, chunks_used). messages is None when
+            there is nothing to send to the model; early_answer is then the reply.
         """
         if not context_chunks:
-            return "I couldn't find any relevant information to answer your question."
+            return None, "I couldn't find any relevant information to answer your question.", 0
 
         # Build context from chunks with proper formatting
         context_sections = []
@@ -95,7 +96,11 @@ class AnswerGenerator:
             total_chars += len(context_part)
 
         if not context_sections:
-            return "I found some documents but couldn't extract meaningful content to answer your question."
+            return (
+                None,
+                "I found some documents but couldn't extract meaningful content to answer your question.",
+                0,
+            )
 
         context = "\n\n---\n\n".join(context_sections)
 
@@ -148,13 +153,50 @@ Do NOT:
 
 Please provide a clear, accurate answer based on the context above. If the context doesn't fully answer the question, indicate what information is missing."""
 
+        messages = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt},
+        ]
+        return messages, None, len(context_sections)
+
+    @staticmethod
+    def _fallback_answer(context_chunks: list[dict[str, Any]]) -> str:
+        """Answer to return when the model call fails."""
+        # Fallback: return first chunk as answer
+        if context_chunks:
+            first_chunk = context_chunks[0].get("text", "").strip()
+            if first_chunk:
+                return f"Based on the documents: {first_chunk[:500]}..."
+        return "I encountered an error generating an answer. Please check the sources below."
+
+    @log_timing("generate_answer")
+    def generate(
+        self,
+        query: str,
+        context_chunks: list[dict[str, Any]],
+        max_context_tokens: int = 3000,
+    ) -> str:
+        """
+        Generate answer from query and context chunks using GPT.
+
+        Args:
+            query: User query
+            context_chunks: List of retrieved chunks with 'text', 'corpus', 'score', etc.
+            max_context_tokens: Maximum tokens to use for context (rough estimate)
+
+        Returns:
+            Generated answer string
+        """
+        messages, early_answer, chunks_used = self._build_messages(
+            query, context_chunks, max_context_tokens
+        )
+        if messages is None:
+            return early_answer
+
         try:
             response = self.client.chat.completions.create(
                 model=self.model,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt},
-                ],
+                messages=messages,
                 temperature=0.3,  # Lower temperature for more factual answers
                 max_tokens=1000,  # Reasonable limit for answers
             )
@@ -167,7 +209,7 @@ Please provide a clear, accurate answer based on the context above. If the conte
             logger.info(
                 "answer_generated",
                 query_preview=query[:50],
-                chunks_used=len(context_sections),
+                chunks_used=chunks_used,
                 answer_length=len(answer),
             )
 
@@ -175,10 +217,63 @@ Please provide a clear, accurate answer based on the context above. If the conte
 
         except Exception as e:
             logger.error("answer_generation_failed", error=str(e), query_preview=query[:50])
-            # Fallback: return first chunk as answer
-            if context_chunks:
-                first_chunk = context_chunks[0].get("text", "").strip()
-                if first_chunk:
-                    return f"Based on the documents: {first_chunk[:500]}..."
-            return "I encountered an error generating an answer. Please check the sources below."
+            return self._fallback_answer(context_chunks)
+
+    def generate_stream(
+        self,
+        query: str,
+        context_chunks: list[dict[str, Any]],
+        max_context_tokens: int = 3000,
+    ) -> Iterator[str]:
+        """
+        Stream an answer as text fragments while GPT generates it.
+
+        Args:
+            query: User query
+            context_chunks: List of retrieved chunks with 'text', 'corpus', 'score', etc.
+            max_context_tokens: Maximum tokens to use for context (rough estimate)
+
+        Yields:
+            Answer text fragments in order; concatenated they form the answer
+        """
+        messages, early_answer, chunks_used = self._build_messages(
+            query, context_chunks, max_context_tokens
+        )
+        if messages is None:
+            yield early_answer
+            return
+
+        answer_length = 0
+        try:
+            stream = self.client.chat.completions.create(
+                model=self.model,
+                messages=messages,
+                temperature=0.3,  # Lower temperature for more factual answers
+                max_tokens=1000,  # Reasonable limit for answers
+                stream=True,
+            )
+            for chunk in stream:
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    answer_length += len(delta)
+                    yield delta
+        except Exception as e:
+            logger.error("answer_stream_failed", error=str(e), query_preview=query[:50])
+            if answer_length == 0:
+                yield self._fallback_answer(context_chunks)
+            return
+
+        if answer_length == 0:
+            logger.warning("empty_answer_from_gpt", query=query[:50])
+            yield "I couldn't generate an answer. Please check the sources below for more information."
+            return
+
+        logger.info(
+            "answer_streamed",
+            query_preview=query[:50],
+            chunks_used=chunks_used,
+            answer_length=answer_length,
+        )
 
@@ -27,6 +27,15 @@ class Config:
     # Retrieval Configuration
     max_tokens: int = 2048
     top_k: int = 5
+    # Start SQL generation alongside the context cache check instead of after it
+    speculative_sql: bool = True
+    # Cosine similarity a prompt example needs to answer a SQL query instead of
+    # generating SQL (calibrated for text-embedding-3-small)
+    context_match_threshold: float = 0.85
+
+    # Result ranking: local cross-encoder (ONNX model directory) or LLM evaluation
+    reranker_model_path: Optional[str] = None
+    use_llm_evaluator: bool = True
 
     # Testing
     embed_offline: bool = False
@@ -35,6 +44,7 @@ class Config:
     def from_env(cls) -> "Config":
         """Load configuration from environment variables."""
         openai_api_key = os.getenv("OPENAI_API_KEY")
+        reranker_model_path = os.getenv("RERANKER_MODEL_PATH")
 
         return cls(
             rag_bucket=os.getenv("RAG_BUCKET"),  # Optional, not used in local mode
@@ -43,6 +53,11 @@ class Config:
             openai_api_key=openai_api_key,
             max_tokens=int(os.getenv("MAX_TOKENS", "2048")),
             top_k=int(os.getenv("TOP_K", "5")),
+            speculative_sql=os.getenv("SPECULATIVE_SQL", "1") == "1",
+            context_match_threshold=float(os.getenv("CONTEXT_MATCH_THRESHOLD", "0.85")),
+            reranker_model_path=reranker_model_path,
+            # The LLM evaluator stays the default unless a reranker model is configured
+            use_llm_evaluator=os.getenv("USE_LLM_EVALUATOR", "0" if reranker_model_path else "1") == "1",
             embed_offline=os.getenv("EMBED_OFFLINE", "0") == "1",
         )
 
@@ -50,4 +65,6 @@ class Config:
         """Validate configuration values."""
         if self.top_k < 1:
             raise ValueError("TOP_K must be >= 1")
+        if not 0.0 <= self.context_match_threshold <= 1.0:
+            raise ValueError("CONTEXT_MATCH_THRESHOLD must be between 0 and 1")
 
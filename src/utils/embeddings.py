@@ -2,6 +2,7 @@
 
 import hashlib
 import os
+from functools import lru_cache
 
 import numpy as np
 from openai import OpenAI
@@ -12,6 +13,17 @@ from src.utils.logging import get_logger
 logger = get_logger(__name__)
 
 
+@lru_cache(maxsize=4)
+def _openai_client(api_key: str, timeout: float, max_retries: int) -> OpenAI:
+    """
+    Get a shared OpenAI client for the given settings.
+
+    Clients are thread-safe and keep a connection pool, so reusing one saves
+    the connection setup (TCP + TLS) that a fresh client pays on every call.
+    """
+    return OpenAI(api_key=api_key, timeout=timeout, max_retries=max_retries)
+
+
 def _deterministic_embedding(text: str, dimension: int = 1536) -> np.ndarray:
     """
     Generate deterministic embedding for testing.
@@ -51,12 +63,8 @@ def embed_texts(texts: list[str], config: Config | None = None, batch_size: int
     if not config.openai_api_key:
         raise ValueError("OPENAI_API_KEY required when EMBED_OFFLINE=0")
 
-    # Create client with timeout to avoid hanging
-    client = OpenAI(
-        api_key=config.openai_api_key,
-        timeout=20.0,  # 20 second timeout per request
-        max_retries=2,  # Retry up to 2 times
-    )
+    # Client with timeout to avoid hanging: 20 seconds per request, up to 2 retries
+    client = _openai_client(config.openai_api_key, timeout=20.0, max_retries=2)
     logger.debug("embedding_texts", count=len(texts), model=config.embed_model, batch_size=batch_size)
 
     all_vectors = []
@@ -137,12 +145,9 @@ def embed_query(text: str, config: Config | None = None) -> np.ndarray:
     if not config.openai_api_key:
         raise ValueError("OPENAI_API_KEY required when EMBED_OFFLINE=0")
 
-    # Create client with timeout to avoid hanging (must complete within API Gateway timeout)
-    client = OpenAI(
-        api_key=config.openai_api_key,
-        timeout=15.0,  # 15 second timeout per request (API Gateway REST has 29s limit)
-        max_retries=1,  # Single retry for faster failure
-    )
+    # Client with timeout to avoid hanging (must complete within API Gateway timeout):
+    # 15 seconds per request (API Gateway REST has 29s limit), single retry for faster failure
+    client = _openai_client(config.openai_api_key, timeout=15.0, max_retries=1)
     logger.debug("embedding_query", query_preview=text[:50], model=config.embed_model)
 
     try:
@@ -1,6 +1,7 @@
 """MySQL client for SAS data queries."""
 
 import os
+from collections.abc import Iterator
 from contextlib import contextmanager
 from typing import Any
 
@@ -18,6 +19,9 @@ from src.utils.logging import get_logger
 
 logger = get_logger(__name__)
 
+# Rows pulled per round trip by iter_query
+FETCH_BATCH_SIZE = 64
+
 
 class MySQLClient:
     """MySQL client for querying SAS data."""
@@ -106,12 +110,48 @@ class MySQLClient:
         Returns:
             List of result rows as dictionaries
         """
-        # Add LIMIT if not already present
-        query_upper = query.upper().strip()
-        if "LIMIT" not in query_upper:
-            query = f"{query.rstrip(';')} LIMIT {limit}"
+        return self.execute_query(self._with_limit(query, limit), params)
+
+    def iter_query(
+        self, query: str, limit: int = 10, params: tuple | None = None
+    ) -> Iterator[dict[str, Any]]:
+        """
+        Execute a query with a limit and yield rows as they are fetched.
+
+        Rows are read in batches of FETCH_BATCH_SIZE from an unbuffered cursor,
+        and reading stops after limit rows even if the query's own LIMIT is
+        larger; the driver discards the rest without building row dicts.
+
+        Args:
+            query: SQL query string
+            limit: Maximum number of rows to yield
+            params: Query parameters
+
+        Yields:
+            Result rows as dictionaries
+        """
+        with self.get_connection() as conn:
+            # Lets the connection commit/close with rows left unread after an early stop
+            conn.can_consume_results = True
+            cursor = conn.cursor(dictionary=True)
+            try:
+                cursor.execute(self._with_limit(query, limit), params)
+                remaining = limit
+                while remaining > 0:
+                    batch = cursor.fetchmany(min(FETCH_BATCH_SIZE, remaining))
+                    if not batch:
+                        break
+                    yield from batch
+                    remaining -= len(batch)
+            finally:
+                cursor.close()
 
-        return self.execute_query(query, params)
+    @staticmethod
+    def _with_limit(query: str, limit: int) -> str:
+        """Add LIMIT if not already present."""
+        if "LIMIT" not in query.upper():
+            return f"{query.strip().rstrip(';')} LIMIT {limit}"
+        return query
 
     def test_connection(self) -> bool:
         """
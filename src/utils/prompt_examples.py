@@ -1,10 +1,21 @@
 """Load and manage Q&A examples for prompt engineering."""
 
+import hashlib
 import json
 import math
+import os
+import re
 from pathlib import Path
 from typing import Any
 
+import numpy as np
+
+from src.utils.config import Config
+from src.utils.embeddings import embed_texts
+from src.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
 
 class PromptExamples:
     """Manage Q&A examples for enhancing prompts."""
@@ -22,6 +33,9 @@ class PromptExamples:
         self._examples: list[dict[str, Any]] = []
         self._loaded = False
         self._auto_clean = True  # Automatically clean entries when loading
+        self._source_files: list[Path] = []  # Files the examples were loaded from
+        # Row-normalized question embeddings (N, d), aligned with _examples
+        self._question_embeddings: np.ndarray | None = None
     
     def _is_nan(self, value: Any) -> bool:
         """Check if value is NaN."""
@@ -187,17 +201,49 @@ class PromptExamples:
         # Filter out other types (lists without context, numbers, etc.)
         return None
     
+    def _add_example(self, question: str, answer: Any, source: str) -> None:
+        """Clean (if enabled) and store a single Q&A pair."""
+        # Clean answer if auto-clean is enabled
+        if self._auto_clean:
+            cleaned_answer = self._clean_answer(question, answer)
+            if cleaned_answer is None:
+                return  # Skip filtered entries
+            answer = cleaned_answer
+        
+        self._examples.append({
+            "question": question,
+            "answer": answer,
+            "source": source,
+        })
+    
+    def _load_jsonl(self, jsonl_file: Path) -> None:
+        """Load Q&A pairs from a JSONL file (one {question, answer} object per line)."""
+        with open(jsonl_file, "r", encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                item = json.loads(line)
+                question = item.get("question", "")
+                answer = item.get("answer", "")
+                
+                if not question or not answer:
+                    continue
+                
+                self._add_example(question, answer, jsonl_file.stem)
+    
     def load(self) -> None:
-        """Load all Q&A examples from JSON files in the examples directory."""
+        """Load all Q&A examples from JSON and JSONL files in the examples directory."""
         if self._loaded:
             return
         
         if not self.examples_dir.exists():
             return
         
-        # Find all JSON files (exclude README and other non-QA files)
+        # Find all JSON/JSONL files (exclude README and other non-QA files)
         json_files = [f for f in self.examples_dir.glob("*.json") 
                      if not f.name.startswith("_")]  # Skip files starting with _
+        jsonl_files = [f for f in self.examples_dir.glob("*.jsonl")
+                      if not f.name.startswith("_")]
         
         for json_file in json_files:
             try:
@@ -214,18 +260,7 @@ class PromptExamples:
                         if not question or not answer:
                             continue
                         
-                        # Clean answer if auto-clean is enabled
-                        if self._auto_clean:
-                            cleaned_answer = self._clean_answer(question, answer)
-                            if cleaned_answer is None:
-                                continue  # Skip filtered entries
-                            answer = cleaned_answer
-                        
-                        self._examples.append({
-                            "question": question,
-                            "answer": answer,
-                            "source": json_file.stem,
-                        })
+                        self._add_example(question, answer, json_file.stem)
                 
                 elif isinstance(data, dict):
                     # Dict format: keys are questions, values are answers
@@ -233,22 +268,20 @@ class PromptExamples:
                         if not question:
                             continue
                         
-                        # Clean answer if auto-clean is enabled
-                        if self._auto_clean:
-                            cleaned_answer = self._clean_answer(question, answer)
-                            if cleaned_answer is None:
-                                continue  # Skip filtered entries
-                            answer = cleaned_answer
-                        
-                        self._examples.append({
-                            "question": question,
-                            "answer": answer,
-                            "source": json_file.stem,
-                        })
+                        self._add_example(question, answer, json_file.stem)
+                self._source_files.append(json_file)
             except Exception as e:
                 # Skip files that can't be loaded
                 continue
         
+        for jsonl_file in jsonl_files:
+            try:
+                self._load_jsonl(jsonl_file)
+                self._source_files.append(jsonl_file)
+            except Exception:
+                # Skip files that can't be loaded
+                continue
+        
         self._loaded = True
     
     def get_examples(self, max_examples: int = 5, query: str | None = None) -> list[dict[str, Any]]:
@@ -282,6 +315,96 @@ class PromptExamples:
         
         return examples[:max_examples]
     
+    @property
+    def embedded(self) -> bool:
+        """Whether question embeddings are available for similar_examples()."""
+        return self._question_embeddings is not None
+    
+    def _embeddings_cache_path(self, config: Config) -> Path:
+        """
+        Path of the persisted question embeddings for the loaded files and model.
+        
+        The name carries the embedding model and a hash of the source files, so
+        editing an examples file or switching models never reuses stale vectors.
+        """
+        model = "offline" if config.embed_offline else config.embed_model
+        digest = hashlib.sha256(model.encode("utf-8"))
+        for path in sorted(self._source_files):
+            digest.update(path.name.encode("utf-8"))
+            digest.update(path.read_bytes())
+        slug = re.sub(r"[^A-Za-z0-9.-]+", "-", model)
+        return self.examples_dir / f"_embeddings_{slug}_{digest.hexdigest()[:16]}.npy"
+    
+    def embed_questions(self, config: Config | None = None) -> None:
+        """
+        Embed every example question once for similarity search.
+        
+        Embeddings are saved next to the example files and reloaded on later
+        calls while the files and embedding model are unchanged.
+        
+        Args:
+            config: Config instance (uses Config.from_env() if None)
+        """
+        if not self._loaded:
+            self.load()
+        if not self._examples:
+            return
+        if config is None:
+            config = Config.from_env()
+        
+        cache_path = self._embeddings_cache_path(config)
+        if cache_path.exists():
+            try:
+                embeddings = np.load(cache_path)
+                if embeddings.shape[0] == len(self._examples):
+                    self._question_embeddings = embeddings
+                    logger.info("context_embeddings_cache_hit", path=str(cache_path))
+                    return
+            except (OSError, ValueError) as e:
+                logger.warning("context_embeddings_cache_unreadable", path=str(cache_path), error=str(e))
+        
+        embeddings = embed_texts([ex["question"] for ex in self._examples], config)
+        self._question_embeddings = embeddings
+        
+        # Write to a temp file and rename so a concurrent reader never sees a partial file
+        tmp_path = cache_path.with_name(cache_path.name + f".{os.getpid()}.tmp")
+        try:
+            with open(tmp_path, "wb") as f:
+                np.save(f, embeddings)
+            tmp_path.replace(cache_path)
+            logger.info("context_embeddings_cached", path=str(cache_path))
+            # Drop embeddings of earlier versions of the files for this model
+            prefix = cache_path.name.rsplit("_", 1)[0] + "_"
+            for stale in self.examples_dir.glob(f"{prefix}*.npy"):
+                if stale != cache_path:
+                    stale.unlink(missing_ok=True)
+        except OSError as e:
+            logger.warning("context_embeddings_cache_write_failed", path=str(cache_path), error=str(e))
+            tmp_path.unlink(missing_ok=True)
+    
+    def similar_examples(
+        self, query_embedding: np.ndarray, top_k: int = 3
+    ) -> list[tuple[int, float, dict[str, Any]]]:
+        """
+        Find the examples whose questions are closest to a query embedding.
+        
+        Args:
+            query_embedding: L2-normalized query vector (same model as embed_questions)
+            top_k: Maximum number of examples to return
+        
+        Returns:
+            (example index, cosine similarity, example) tuples, best first
+        """
+        embeddings = self._question_embeddings
+        if embeddings is None or top_k <= 0:
+            return []
+        
+        scores = embeddings @ query_embedding
+        k = min(top_k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(int(i), float(scores[i]), self._examples[i]) for i in top]
+    
     def format_for_prompt(self, max_examples: int = 3, query: str | None = None) -> str:
         """
         Format examples as a string for inclusion in prompts.
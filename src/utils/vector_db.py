@@ -1,9 +1,12 @@
 """Vector database client using Chroma."""
 
 import os
+import threading
 from pathlib import Path
 from typing import Any
 
+import numpy as np
+
 try:
     import chromadb
     from chromadb.config import Settings
@@ -18,6 +21,23 @@ from src.utils.logging import get_logger
 
 logger = get_logger(__name__)
 
+# Safe defaults for bulk ingest into the local SQLite-backed store
+SQLITE_INGEST_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "temp_store": "MEMORY",
+    "cache_size": "-262144",  # 256 MiB
+}
+
+# One-shot rebuilds only: no journal and an exclusive lock (not crash-safe)
+SQLITE_FAST_INGEST_PRAGMAS = {
+    "journal_mode": "OFF",
+    "synchronous": "OFF",
+    "locking_mode": "EXCLUSIVE",
+    "temp_store": "MEMORY",
+    "cache_size": "-262144",
+}
+
 
 class VectorDBClient:
     """Chroma vector database client for PDF embeddings."""
@@ -39,6 +59,7 @@ class VectorDBClient:
         if use_local:
             db_path = os.getenv("VECTOR_DB_PATH", "data/vector_db")
             Path(db_path).mkdir(parents=True, exist_ok=True)
+            self.db_path = db_path
             
             self.client = chromadb.PersistentClient(
                 path=db_path,
@@ -55,6 +76,43 @@ class VectorDBClient:
         self.collection_name = "pdf_documents"
         self.collection = None
 
+        # Chroma keeps one SQLite connection per thread, so pragmas are applied
+        # lazily on each thread that writes
+        self._sqlite_pragmas: dict[str, str] = {}
+        self._pragma_state = threading.local()
+
+    def tune_sqlite(self, fast_ingest: bool = False) -> None:
+        """
+        Enable SQLite pragma tuning for bulk ingest.
+
+        Args:
+            fast_ingest: Disable journaling/fsync and lock exclusively. Only for
+                one-shot rebuilds with a single writer thread.
+        """
+        self._sqlite_pragmas = dict(
+            SQLITE_FAST_INGEST_PRAGMAS if fast_ingest else SQLITE_INGEST_PRAGMAS
+        )
+        self._pragma_state = threading.local()
+        self._apply_sqlite_pragmas()
+
+    def _apply_sqlite_pragmas(self) -> None:
+        """Apply configured pragmas to the current thread's Chroma connection."""
+        if not self._sqlite_pragmas or getattr(self._pragma_state, "applied", False):
+            return
+        self._pragma_state.applied = True
+
+        try:
+            from chromadb.db.impl.sqlite import SqliteDB
+
+            # Internal API: absent on Chroma builds without the Python SQLite backend
+            sqlite_db = self.client._system.instance(SqliteDB)
+            conn = sqlite_db._conn_pool.connect()
+            for name, value in self._sqlite_pragmas.items():
+                conn.execute(f"PRAGMA {name}={value}")
+            logger.info("sqlite_pragmas_applied", pragmas=self._sqlite_pragmas)
+        except Exception as e:
+            logger.warning("sqlite_pragmas_failed", error=str(e))
+
     def get_or_create_collection(self) -> Any:
         """
         Get or create the PDF documents collection.
@@ -105,6 +163,7 @@ class VectorDBClient:
             metadatas: Optional list of metadata dicts
         """
         collection = self.get_or_create_collection()
+        self._apply_sqlite_pragmas()
         
         if metadatas is None:
             metadatas = [{}] * len(documents)
@@ -117,6 +176,17 @@ class VectorDBClient:
         
         logger.info("documents_added", count=len(documents), collection=self.collection_name)
 
+    def delete_documents(self, where: dict[str, Any]) -> None:
+        """
+        Delete documents matching a metadata filter.
+
+        Args:
+            where: Metadata filter (e.g. {"source_file": "protocol.pdf"})
+        """
+        collection = self.get_or_create_collection()
+        collection.delete(where=where)
+        logger.info("documents_deleted", where=where, collection=self.collection_name)
+
     def search(
         self,
         query: str,
@@ -134,6 +204,31 @@ class VectorDBClient:
         Returns:
             Dictionary with 'ids', 'documents', 'metadatas', 'distances'
         """
+        return self.search_many([query], n_results=n_results, where=where)[0]
+
+    def search_many(
+        self,
+        query_texts: list[str],
+        n_results: int = 5,
+        where: dict[str, Any] | None = None,
+        query_embeddings: list[np.ndarray] | None = None,
+    ) -> list[dict[str, Any]]:
+        """
+        Search for several queries in one batched Chroma query.
+
+        The queries share one embedding request and one index lookup batch.
+
+        Args:
+            query_texts: Query texts
+            n_results: Number of results to return per query
+            where: Optional metadata filter
+            query_embeddings: Precomputed embeddings of query_texts (same model
+                as the collection); skips Chroma's embedding request
+
+        Returns:
+            One dictionary with 'ids', 'documents', 'metadatas', 'distances'
+            per query, in query order
+        """
         collection = self.get_or_create_collection()
         
         # Ensure OpenAI API key is set for embedding function
@@ -142,27 +237,39 @@ class VectorDBClient:
             os.environ["CHROMA_OPENAI_API_KEY"] = self.config.openai_api_key
         
         try:
-            results = collection.query(
-                query_texts=[query],
-                n_results=n_results,
-                where=where,
-            )
+            if query_embeddings is not None:
+                results = collection.query(
+                    query_embeddings=[np.asarray(e, dtype=np.float32).tolist() for e in query_embeddings],
+                    n_results=n_results,
+                    where=where,
+                )
+            else:
+                results = collection.query(
+                    query_texts=query_texts,
+                    n_results=n_results,
+                    where=where,
+                )
         except Exception as e:
-            logger.error("chroma_query_failed", error=str(e), query_preview=query[:50])
-            return {
-                "ids": [],
-                "documents": [],
-                "metadatas": [],
-                "distances": [],
-            }
+            logger.error("chroma_query_failed", error=str(e), query_preview=query_texts[0][:50] if query_texts else "")
+            return [
+                {"ids": [], "documents": [], "metadatas": [], "distances": []}
+                for _ in query_texts
+            ]
         
-        # Convert to simpler format
-        return {
-            "ids": results["ids"][0] if results["ids"] and len(results["ids"]) > 0 else [],
-            "documents": results["documents"][0] if results["documents"] and len(results["documents"]) > 0 else [],
-            "metadatas": results["metadatas"][0] if results["metadatas"] and len(results["metadatas"]) > 0 else [],
-            "distances": results["distances"][0] if results["distances"] and len(results["distances"]) > 0 else [],
-        }
+        # Convert to simpler format (one flat dict per query)
+        def column(name: str, i: int) -> list[Any]:
+            values = results.get(name)
+            return values[i] if values and len(values) > i and values[i] is not None else []
+        
+        return [
+            {
+                "ids": column("ids", i),
+                "documents": column("documents", i),
+                "metadatas": column("metadatas", i),
+                "distances": column("distances", i),
+            }
+            for i in range(len(query_texts))
+        ]
 
     def delete_collection(self) -> None:
         """Delete the collection (for rebuilding)."""
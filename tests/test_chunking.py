@@ -0,0 +1,68 @@
+"""Tests for batched token-window chunking."""
+
+import pytest
+
+from src.indexers import common
+from src.indexers.common import chunk_texts_batched
+
+tiktoken = pytest.importorskip("tiktoken")
+
+
+@pytest.fixture(autouse=True)
+def byte_encoding(monkeypatch):
+    """Use a byte-level encoding (one token per byte) instead of downloading cl100k_base."""
+    enc = tiktoken.Encoding(
+        name="bytes",
+        pat_str=r"\S+|\s+",
+        mergeable_ranks={bytes([i]): i for i in range(256)},
+        special_tokens={},
+    )
+    monkeypatch.setattr(common, "_get_encoding", lambda name: enc)
+    return enc
+
+
+def text_of(length: int) -> str:
+    """ASCII text of exactly length characters (and tokens)."""
+    return "".join(chr(ord("a") + i % 26) for i in range(length))
+
+
+def test_windows_overlap():
+    """Windows are max_tokens long and consecutive ones share overlap tokens."""
+    text = text_of(250)
+    (chunks,) = chunk_texts_batched([text], max_tokens=100, overlap=20)
+
+    assert chunks == [text[0:100], text[80:180], text[160:250]]
+    for prev, cur in zip(chunks, chunks[1:]):
+        assert prev[-20:] == cur[:20]
+
+
+def test_text_within_one_window():
+    """A text no longer than max_tokens is a single chunk."""
+    text = text_of(100)
+    assert chunk_texts_batched([text], max_tokens=100, overlap=20) == [[text]]
+
+
+def test_results_align_with_inputs():
+    """Each input gets its own chunk list, empty for blank or artifact-length texts."""
+    long_text = text_of(180)
+    results = chunk_texts_batched(["", text_of(30), long_text, "   "], max_tokens=100, overlap=20)
+
+    assert len(results) == 4
+    assert results[0] == []
+    assert results[1] == []  # 30 chars is below the 50-char artifact filter
+    assert results[2] == [long_text[0:100], long_text[80:180]]
+    assert results[3] == []
+
+
+def test_short_trailing_window_dropped():
+    """A final window of 50 characters or fewer is filtered as an artifact."""
+    text = text_of(130)
+    (chunks,) = chunk_texts_batched([text], max_tokens=100, overlap=20)
+
+    assert chunks == [text[0:100]]
+
+
+def test_overlap_must_be_smaller_than_window():
+    """overlap >= max_tokens is rejected."""
+    with pytest.raises(ValueError):
+        chunk_texts_batched(["text"], max_tokens=64, overlap=64)
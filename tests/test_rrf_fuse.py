@@ -0,0 +1,55 @@
+"""Tests for reciprocal rank fusion of multi-query vector search results."""
+
+import pytest
+
+from src.retrieval.vector_db_retriever import RRF_K, _rrf_fuse
+
+
+def result(chunk_id: str, score: float) -> dict:
+    """Minimal formatted search result."""
+    return {"chunk_id": chunk_id, "score": score, "text": f"text of {chunk_id}", "corpus": "pdf"}
+
+
+def test_single_ranking_keeps_order():
+    """One ranking comes back in its own order with RRF scores added."""
+    fused = _rrf_fuse([[result("a", 0.9), result("b", 0.8), result("c", 0.7)]], top_k=5)
+
+    assert [r["chunk_id"] for r in fused] == ["a", "b", "c"]
+    assert fused[0]["rrf_score"] == pytest.approx(1 / (RRF_K + 1))
+    assert fused[2]["rrf_score"] == pytest.approx(1 / (RRF_K + 3))
+
+
+def test_chunks_found_by_several_queries_rank_first():
+    """Reciprocal ranks add up across rankings."""
+    rankings = [
+        [result("a", 0.9), result("b", 0.8)],
+        [result("c", 0.95), result("b", 0.85)],
+    ]
+    fused = _rrf_fuse(rankings, top_k=5)
+
+    assert fused[0]["chunk_id"] == "b"
+    assert fused[0]["rrf_score"] == pytest.approx(2 / (RRF_K + 2))
+    assert {r["chunk_id"] for r in fused[1:]} == {"a", "c"}
+
+
+def test_keeps_best_scoring_copy():
+    """A merged chunk keeps the copy with the highest similarity."""
+    rankings = [[result("a", 0.6)], [result("a", 0.9)], [result("a", 0.7)]]
+    fused = _rrf_fuse(rankings, top_k=5)
+
+    assert len(fused) == 1
+    assert fused[0]["score"] == 0.9
+
+
+def test_top_k_and_inputs_untouched():
+    """Only top_k results are returned and the input dicts are not modified."""
+    ranking = [result(str(i), 1.0 - i / 10) for i in range(5)]
+    fused = _rrf_fuse([ranking], top_k=2)
+
+    assert [r["chunk_id"] for r in fused] == ["0", "1"]
+    assert all("rrf_score" not in r for r in ranking)
+
+
+def test_empty_rankings():
+    """No results in, no results out."""
+    assert _rrf_fuse([[], []], top_k=5) == []
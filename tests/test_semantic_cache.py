@@ -0,0 +1,123 @@
+"""Tests for the LSH semantic cache."""
+
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from src.retrieval import semantic_cache
+from src.retrieval.semantic_cache import SemanticCache
+
+DIM = 32
+
+
+def unit(vec: np.ndarray) -> np.ndarray:
+    """L2-normalize a vector as float32."""
+    vec = np.asarray(vec, dtype=np.float32)
+    return vec / np.linalg.norm(vec)
+
+
+def random_unit(seed: int) -> np.ndarray:
+    """Deterministic random unit vector."""
+    return unit(np.random.default_rng(seed).standard_normal(DIM))
+
+
+def nearby(vec: np.ndarray, cosine: float, seed: int = 1) -> np.ndarray:
+    """Unit vector with the given cosine similarity to vec."""
+    noise = np.random.default_rng(seed).standard_normal(DIM).astype(np.float32)
+    noise -= (noise @ vec) * vec
+    noise = unit(noise)
+    return unit(cosine * vec + np.sqrt(1.0 - cosine**2) * noise)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Replace the cache's monotonic clock with a manually advanced one."""
+    now = SimpleNamespace(t=1000.0)
+    monkeypatch.setattr(semantic_cache, "time", SimpleNamespace(monotonic=lambda: now.t))
+    return now
+
+
+def test_exact_hit_and_miss():
+    """An identical embedding hits; an unrelated one misses."""
+    cache = SemanticCache(dim=DIM)
+    query = random_unit(0)
+    cache.put(query, "answer")
+
+    assert cache.get(query) == "answer"
+    assert cache.get(random_unit(99)) is None
+    assert len(cache) == 1
+
+
+def test_dim_inferred_from_first_embedding():
+    """Without dim, hyperplanes are sized from the first embedding."""
+    cache = SemanticCache()
+    query = random_unit(0)
+    cache.put(query, "answer")
+
+    assert cache.get(query) == "answer"
+
+
+def test_threshold():
+    """Near-duplicates hit at or above the threshold and miss below it."""
+    # Few bits per table so the near-duplicates share a bucket in some table
+    cache = SemanticCache(dim=DIM, n_tables=16, bits=4, threshold=0.95)
+    query = random_unit(0)
+    cache.put(query, "answer")
+
+    assert cache.get(nearby(query, 0.99)) == "answer"
+    assert cache.get(nearby(query, 0.90)) is None
+
+
+def test_best_match_wins():
+    """The most similar entry above the threshold is returned."""
+    cache = SemanticCache(dim=DIM, n_tables=16, bits=4, threshold=0.9)
+    query = random_unit(0)
+    cache.put(nearby(query, 0.95, seed=1), "close")
+    cache.put(nearby(query, 0.99, seed=2), "closer")
+
+    assert cache.get(query) == "closer"
+
+
+def test_tags_are_separate():
+    """Entries only match lookups with the same tag."""
+    cache = SemanticCache(dim=DIM)
+    query = random_unit(0)
+    cache.put(query, "top5", tag=5)
+    cache.put(query, "top10", tag=10)
+
+    assert cache.get(query, tag=5) == "top5"
+    assert cache.get(query, tag=10) == "top10"
+    assert cache.get(query, tag=3) is None
+    assert cache.get(query) is None
+
+
+def test_ttl_expiry(clock):
+    """Entries expire after ttl and are evicted on lookup."""
+    cache = SemanticCache(dim=DIM, ttl=60)
+    query = random_unit(0)
+    cache.put(query, "answer")
+
+    clock.t += 59
+    assert cache.get(query) == "answer"
+
+    clock.t += 1
+    assert cache.get(query) is None
+    assert len(cache) == 0
+    assert all(not table for table in cache._tables)
+
+
+def test_max_entries_evicts_oldest():
+    """Putting beyond max_entries drops the oldest entries."""
+    cache = SemanticCache(dim=DIM, max_entries=2)
+    queries = [random_unit(seed) for seed in range(3)]
+    for i, query in enumerate(queries):
+        cache.put(query, i)
+
+    assert len(cache) == 2
+    assert cache.get(queries[0]) is None
+    assert cache.get(queries[1]) == 1
+    assert cache.get(queries[2]) == 2
+    # The evicted entry is gone from every bucket, not just the entry list
+    filed = sum(len(bucket) for table in cache._tables for bucket in table.values())
+    assert filed == 2 * cache.n_tables